@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Load generator for bargaining_server.py.
+
+Simulates many customers negotiating at once. Each customer opens a
+keep-alive connection, creates a session and raises its offer every round
+until the deal is accepted or it gives up. Reports offers/sec and the
+p50/p99 latency of the offer requests.
+
+    python bargaining_loadgen.py --customers 5000 --concurrency 500
+    python bargaining_loadgen.py --spawn-server      # start a local server first
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+
+PRODUCT = {"product_name": "Hand-carved wooden bowl", "ideal_price": 5000.0, "min_price": 3500.0}
+LANGUAGES = ("en", "te", "hi", "pa", "bn")
+MAX_ROUNDS = 12
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bargaining_server.py")
+
+
+class Client:
+    """
+    One keep-alive HTTP/1.1 connection that sends JSON requests.
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+        )
+        await self.writer.drain()
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+        length = 0
+        for line in header_lines:
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        data = json.loads(await self.reader.readexactly(length)) if length else {}
+        return int(status_line.split(" ", 2)[1]), data
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+async def customer(host, port, latencies, results, rng):
+    client = Client(host, port)
+    try:
+        status, session = await client.request("POST", "/sessions", {
+            **PRODUCT,
+            "customer_language": rng.choice(LANGUAGES),
+            "seller_language": rng.choice(LANGUAGES),
+            "loyalty_points": rng.choice((0, 0, 100)),
+        })
+        if status != 201:
+            results["errors"] += 1
+            return
+        path = f"/sessions/{session['session_id']}/offers"
+        # Start well below the asking price and close part of the gap every round
+        offer = PRODUCT["ideal_price"] * rng.uniform(0.55, 0.8)
+        for _ in range(MAX_ROUNDS):
+            started = time.perf_counter()
+            status, reply = await client.request("POST", path, {"offer": round(offer)})
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                results["errors"] += 1
+                return
+            if reply["accepted"]:
+                results["deals"] += 1
+                return
+            offer += (reply["current_price"] - offer) * rng.uniform(0.3, 0.7) + 1
+        results["abandoned"] += 1
+        await client.request("DELETE", f"/sessions/{session['session_id']}")
+    except (ConnectionError, asyncio.IncompleteReadError) as e:
+        results["errors"] += 1
+        if results["errors"] == 1:
+            print(f"⚠️ Connection error: {e}")
+    finally:
+        await client.close()
+
+
+async def run_load(host, port, customers, concurrency, seed=None):
+    rng = random.Random(seed)
+    latencies = []
+    results = {"deals": 0, "abandoned": 0, "errors": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited():
+        async with semaphore:
+            await customer(host, port, latencies, results, rng)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(limited() for _ in range(customers)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def quantile(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+
+    return {
+        "customers": customers,
+        "concurrency": concurrency,
+        "offers": len(latencies),
+        "seconds": round(elapsed, 3),
+        "offers_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(quantile(0.5), 3),
+        "p99_ms": round(quantile(0.99), 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        **results,
+    }
+
+
+async def wait_for_server(host, port, timeout=10.0, server=None):
+    """
+    Waits until the server accepts connections. If `server` is the spawned
+    server process, fails as soon as it exits instead of waiting out the
+    timeout.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        if server is not None and server.poll() is not None:
+            raise RuntimeError(f"bargaining_server.py exited with code {server.returncode} before accepting connections")
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the bargaining session server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--customers", type=int, default=2000, help="negotiations to run")
+    parser.add_argument("--concurrency", type=int, default=200, help="negotiations in flight at once")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible offers")
+    parser.add_argument("--spawn-server", action="store_true", help="start bargaining_server.py for the run")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn_server:
+        server = subprocess.Popen([sys.executable, SERVER_SCRIPT, "--host", args.host,
+                                   "--port", str(args.port)], stdout=subprocess.DEVNULL)
+    try:
+        try:
+            asyncio.run(wait_for_server(args.host, args.port, server=server))
+        except RuntimeError as e:
+            sys.exit(f"❌ {e}")
+        report = asyncio.run(run_load(args.host, args.port, args.customers, args.concurrency, args.seed))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"🤝 {report['customers']} negotiations, {report['concurrency']} at a time, in {report['seconds']}s")
+        print(f"📈 {report['offers']} offers: {report['offers_per_sec']} offers/sec")
+        print(f"⏱️ latency p50 {report['p50_ms']} ms, p99 {report['p99_ms']} ms, max {report['max_ms']} ms")
+        print(f"✅ deals {report['deals']}, 🚪 abandoned {report['abandoned']}, ❌ errors {report['errors']}")
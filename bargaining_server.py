@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Asyncio HTTP server hosting many BargainingChatbot negotiations at once.
+
+    python bargaining_server.py --port 8765
+
+    POST   /sessions                 {"product_name", "ideal_price", "min_price",
+                                      "customer_language", "seller_language", "loyalty_points"}
+    POST   /sessions/<id>/offers     {"offer": 4200}
+    DELETE /sessions/<id>
+    GET    /stats
+
+Prices must be finite numbers above zero (and min_price no higher than
+ideal_price); anything else is rejected with 400 and "error": "invalid_price".
+
+Sessions live in memory keyed by a random ID and are dropped after
+SESSION_IDLE_SECONDS without an offer. handle_offer() is pure CPU work, so
+it runs directly on the event loop; connections are kept alive so a client
+can send many offers over one socket. Standard library only.
+"""
+import json
+import math
+import time
+import uuid
+import asyncio
+import argparse
+
+from bargaining_chatbot import BargainingChatbot
+from discount_rules import get_discount_rules
+
+SESSION_IDLE_SECONDS = 10 * 60
+SWEEP_INTERVAL = 30
+MAX_BODY_BYTES = 64 * 1024
+
+STATUS_TEXT = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, error, **details):
+        super().__init__(error)
+        self.status = status
+        self.details = details  # extra fields for the JSON error body
+
+
+def parse_price(value):
+    """
+    Parses a price like 4200, "4200" or "₹4200". Raises ValueError unless it
+    is a finite number above zero (float() also accepts "nan" and "inf").
+    """
+    price = float(str(value).strip("₹"))
+    if not math.isfinite(price) or price <= 0:
+        raise ValueError(f"price must be a positive number, got {value!r}")
+    return price
+
+
+class SessionStore:
+    """
+    Negotiations keyed by session ID, with their last activity time.
+    """
+
+    def __init__(self, idle_seconds=SESSION_IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self.sessions = {}
+        self.created = 0
+        self.expired = 0
+        self.offers = 0
+        self.deals = 0
+
+    def create(self, params):
+        try:
+            ideal_price = parse_price(params["ideal_price"])
+            min_price = parse_price(params["min_price"])
+        except KeyError as e:
+            raise HTTPError(400, f"invalid session parameters: missing {e}")
+        except ValueError as e:
+            raise HTTPError(400, "invalid_price", detail=str(e))
+        if min_price > ideal_price:
+            raise HTTPError(400, "invalid_price", detail="min_price is above ideal_price")
+        if not isinstance(params.get("product_name"), str):
+            raise HTTPError(400, "invalid session parameters: product_name must be a string")
+        try:
+            chatbot = BargainingChatbot(
+                product_name=params["product_name"],
+                ideal_price=ideal_price,
+                min_price=min_price,
+                customer_language=params.get("customer_language", "en"),
+                seller_language=params.get("seller_language", "en"),
+            )
+            chatbot.loyalty_points = int(params.get("loyalty_points", 0))
+        except (KeyError, TypeError, ValueError, OverflowError) as e:
+            raise HTTPError(400, f"invalid session parameters: {e}")
+        session_id = uuid.uuid4().hex
+        self.sessions[session_id] = [chatbot, time.monotonic()]
+        self.created += 1
+        return session_id, chatbot
+
+    def get(self, session_id):
+        entry = self.sessions.get(session_id)
+        if entry is None:
+            raise HTTPError(404, "unknown or expired session")
+        entry[1] = time.monotonic()
+        return entry[0]
+
+    def offer(self, session_id, params):
+        chatbot = self.get(session_id)
+        try:
+            offer = parse_price(params["offer"])
+        except (KeyError, ValueError):
+            raise HTTPError(400, "invalid_price",
+                            message=chatbot._translate("invalid_price", chatbot.customer_language),
+                            accepted=False, current_price=chatbot.current_price)
+        self.offers += 1
+        message = chatbot.handle_offer(offer)
+        if chatbot.is_accepted:
+            self.deals += 1
+            # The negotiation is over; free the session right away
+            self.sessions.pop(session_id, None)
+        return {"message": message, "accepted": chatbot.is_accepted, "current_price": chatbot.current_price}
+
+    def close(self, session_id):
+        chatbot = self.get(session_id)
+        del self.sessions[session_id]
+        return chatbot._translate("goodbye", chatbot.customer_language)
+
+    def expire_idle(self):
+        cutoff = time.monotonic() - self.idle_seconds
+        stale = [session_id for session_id, (_, last_seen) in self.sessions.items() if last_seen < cutoff]
+        for session_id in stale:
+            del self.sessions[session_id]
+        self.expired += len(stale)
+        return len(stale)
+
+    def stats(self):
+        return {"active_sessions": len(self.sessions), "created": self.created, "expired": self.expired,
+                "offers": self.offers, "deals": self.deals, "discount_rule_hits": get_discount_rules().stats()}
+
+
+# -----------------------------------------------------------
+# HTTP
+# -----------------------------------------------------------
+
+async def read_request(reader):
+    """
+    Returns (method, path, headers, body), or None when the client closed the connection.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(413, "headers too large")
+    request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+    try:
+        method, path, _ = request_line.split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "malformed request line")
+    headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+def write_response(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    writer.write(
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+    )
+
+
+def route(store, method, path, body):
+    """
+    Dispatches one request and returns (status, payload).
+    """
+    parts = [part for part in path.split("?", 1)[0].split("/") if part]
+    try:
+        params = json.loads(body) if body else {}
+    except ValueError:
+        params = None
+    if not isinstance(params, dict):
+        raise HTTPError(400, "body must be a JSON object")
+
+    if parts == ["sessions"] and method == "POST":
+        session_id, chatbot = store.create(params)
+        return 201, {"session_id": session_id, "message": chatbot.opening_message(),
+                     "current_price": chatbot.current_price}
+    if len(parts) == 3 and parts[0] == "sessions" and parts[2] == "offers" and method == "POST":
+        return 200, store.offer(parts[1], params)
+    if len(parts) == 2 and parts[0] == "sessions" and method == "DELETE":
+        return 200, {"message": store.close(parts[1])}
+    if parts == ["stats"] and method == "GET":
+        return 200, store.stats()
+    if parts[:1] in (["sessions"], ["stats"]):
+        raise HTTPError(405, f"{method} not allowed on {path}")
+    raise HTTPError(404, f"no route for {path}")
+
+
+async def handle_connection(store, reader, writer):
+    try:
+        while True:
+            try:
+                request = await read_request(reader)
+            except HTTPError as e:
+                # The stream position is unknown after a bad request, so close afterwards
+                write_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+                await writer.drain()
+                break
+            if request is None:
+                break
+            method, path, headers, body = request
+            keep_alive = headers.get("connection", "").lower() != "close"
+            try:
+                status, payload = route(store, method, path, body)
+            except HTTPError as e:
+                status, payload = e.status, {"error": str(e), **e.details}
+            write_response(writer, status, payload, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def sweep_sessions(store, interval=SWEEP_INTERVAL):
+    while True:
+        await asyncio.sleep(interval)
+        expired = store.expire_idle()
+        if expired:
+            print(f"🧹 Expired {expired} idle sessions ({len(store.sessions)} active)")
+
+
+async def serve(host="127.0.0.1", port=8765, idle_seconds=SESSION_IDLE_SECONDS):
+    store = SessionStore(idle_seconds)
+    server = await asyncio.start_server(lambda r, w: handle_connection(store, r, w), host, port, backlog=4096)
+    sweeper = asyncio.create_task(sweep_sessions(store, min(SWEEP_INTERVAL, idle_seconds)))
+    print(f"🤝 Bargaining server listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        sweeper.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve many bargaining sessions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--idle-seconds", type=float, default=SESSION_IDLE_SECONDS,
+                        help="drop sessions without activity for this long")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.idle_seconds))
+    except KeyboardInterrupt:
+        pass
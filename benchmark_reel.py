@@ -0,0 +1,273 @@
+# benchmark_reel.py
+"""
+Benchmark harness for prototype_video.generate_reel.
+
+Renders synthetic scene lists of different lengths from the bundled sample
+images and records wall time, CPU time (including FFmpeg child processes)
+and peak RSS for each pipeline stage into a JSON report, so runs from
+different versions can be compared.
+
+    python benchmark_reel.py --scenes 3 6 12 --modes default streaming --report bench.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+import argparse
+import threading
+import subprocess
+from functools import wraps
+from contextlib import contextmanager, nullcontext
+
+import prototype_video
+import image_cache
+import caption_renderer
+import voiceover_service
+from instrumentation import current_rss
+from moviepy.video.VideoClip import VideoClip
+
+SAMPLE_IMAGES = [
+    "pottery_rawmaterial.jpg",
+    "artisants.jpg",
+    "pottery_finalproduct.jpg",
+]
+
+SAMPLE_LINES = [
+    ("It all begins with humble clay.", "Every masterpiece starts simple"),
+    ("Skilled hands give life to tradition.", "Crafted with passion"),
+    ("A treasure for your home.", "Bring home tradition"),
+    ("Order yours today and support local artisans.", "Shop now"),
+]
+
+
+def stub_generate_script(scene_count):
+    """
+    Stand-in for storygenerator.generate_script that needs no network or API key.
+    Voiceovers are numbered so every scene is synthesized separately.
+    """
+    return [
+        {
+            "scene": f"Synthetic scene {i}",
+            "voiceover": f"{SAMPLE_LINES[i % len(SAMPLE_LINES)][0]} Scene {i + 1}.",
+            "text": SAMPLE_LINES[i % len(SAMPLE_LINES)][1],
+        }
+        for i in range(scene_count)
+    ]
+
+
+# -----------------------------------------------------------
+# MEASUREMENT
+# -----------------------------------------------------------
+
+def children_cpu_time():
+    try:
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return usage.ru_utime + usage.ru_stime
+    except ImportError:  # Windows
+        return 0.0
+
+
+class StageRecorder:
+    """
+    Accumulates calls, wall time, CPU time and peak RSS per named stage.
+
+    A background thread samples RSS every few milliseconds and credits the
+    peak to every stage that is open at that moment, so nested stages
+    (e.g. TTS inside create_scene_clip) each report their own peak.
+    """
+
+    def __init__(self, sample_interval=0.005):
+        self.stages = {}
+        self._open = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, args=(sample_interval,), daemon=True)
+
+    def __enter__(self):
+        self._sampler.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._sampler.join()
+
+    def _sample(self, interval):
+        while not self._stop.wait(interval):
+            rss = current_rss()
+            if rss is None:
+                return
+            with self._lock:
+                for name in self._open:
+                    self._open[name] = max(self._open[name], rss)
+
+    def wrap(self, name, func):
+        @wraps(func)
+        def timed(*args, **kwargs):
+            with self._lock:
+                nested = name in self._open
+                if not nested:
+                    self._open[name] = current_rss() or 0
+            wall_start, cpu_start, child_start = time.perf_counter(), time.process_time(), children_cpu_time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                wall = time.perf_counter() - wall_start
+                cpu = time.process_time() - cpu_start + children_cpu_time() - child_start
+                with self._lock:
+                    peak = self._open.pop(name, 0) if not nested else 0
+                    peak = max(peak, current_rss() or 0)
+                    stage = self.stages.setdefault(name, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_rss_mb": 0.0})
+                    stage["calls"] += 1
+                    if not nested:  # recursive calls are already inside the outer timing
+                        stage["wall_s"] += wall
+                        stage["cpu_s"] += cpu
+                    stage["peak_rss_mb"] = max(stage["peak_rss_mb"], peak / 2 ** 20)
+        return timed
+
+    def report(self):
+        return {
+            name: {**stage, "wall_s": round(stage["wall_s"], 4), "cpu_s": round(stage["cpu_s"], 4),
+                   "peak_rss_mb": round(stage["peak_rss_mb"], 1)}
+            for name, stage in self.stages.items()
+        }
+
+
+def instrument(recorder):
+    """
+    Wraps the pipeline's stage functions with the recorder.
+    Returns a function that restores the originals.
+    """
+    voiceover = voiceover_service.get_voiceover_service()
+    patches = [
+        (voiceover, "synthesize", "tts"),
+        (prototype_video, "create_caption_clip", "caption"),
+        (prototype_video, "create_scene_clip", "create_scene_clip"),
+        (prototype_video, "compose_scene_frame", "compose_scene_frame"),
+        (prototype_video, "render_scene_segment", "render_scene_segment"),
+        (prototype_video, "concatenate_videoclips", "concatenate_videoclips"),
+        (prototype_video, "concat_segments", "concat_segments"),
+        (VideoClip, "write_videofile", "write_videofile"),
+    ]
+    image_cache_obj = image_cache.get_image_cache()
+    patches.append((image_cache_obj, "get_frame", "image_load"))
+
+    originals = []
+    for target, attr, stage in patches:
+        originals.append((target, attr, attr in vars(target), vars(target).get(attr)))
+        setattr(target, attr, recorder.wrap(stage, getattr(target, attr)))
+
+    def restore():
+        for target, attr, had_own, own in originals:
+            if had_own:
+                setattr(target, attr, own)
+            else:
+                delattr(target, attr)  # drop the instance patch, the class method shows through again
+    return restore
+
+
+@contextmanager
+def use_cold_caches(root):
+    """
+    Points the voiceover, image and caption caches at empty folders so every
+    run measures the full cost instead of cache hits. The original caches
+    and SEGMENT_DIR are restored on exit.
+    """
+    originals = (voiceover_service._service, image_cache._cache, caption_renderer._renderer,
+                 prototype_video.SEGMENT_DIR)
+    voiceover_service._service = voiceover_service.VoiceoverService(cache_dir=os.path.join(root, "voiceovers"))
+    image_cache._cache = image_cache.ImageCache(cache_dir=os.path.join(root, "images"))
+    caption_renderer._renderer = caption_renderer.CaptionRenderer(cache_dir=os.path.join(root, "captions"))
+    prototype_video.SEGMENT_DIR = os.path.join(root, "segments")
+    os.makedirs(prototype_video.SEGMENT_DIR, exist_ok=True)
+    try:
+        yield
+    finally:
+        (voiceover_service._service, image_cache._cache, caption_renderer._renderer,
+         prototype_video.SEGMENT_DIR) = originals
+
+
+# -----------------------------------------------------------
+# RUNNER
+# -----------------------------------------------------------
+
+MODES = {
+    "default": {},
+    "streaming": {"streaming": True},
+    "segmented": {"incremental": True},
+}
+
+
+def run_case(scene_count, mode, profile, warm):
+    with tempfile.TemporaryDirectory(prefix="reel_bench_") as cache_root, \
+            (nullcontext() if warm else use_cold_caches(cache_root)):
+        with StageRecorder() as recorder:
+            restore = instrument(recorder)
+            try:
+                started = time.perf_counter()
+                scenes_data = recorder.wrap("generate_script", stub_generate_script)(scene_count)
+                reel_path = prototype_video.generate_reel(
+                    scenes_data,
+                    SAMPLE_IMAGES,
+                    f"bench_{mode}_{scene_count}.mp4",
+                    profile=profile,
+                    **MODES[mode],
+                )
+                total = time.perf_counter() - started
+            finally:
+                restore()
+
+    return {
+        "scene_count": scene_count,
+        "mode": mode,
+        "profile": profile,
+        "ok": bool(reel_path),
+        "total_wall_s": round(total, 4),
+        "stages": recorder.report(),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reel rendering stage by stage.")
+    parser.add_argument("--scenes", type=int, nargs="+", default=[3, 6, 12], help="scene counts to render")
+    parser.add_argument("--modes", nargs="+", default=["default"], choices=sorted(MODES), help="render paths")
+    parser.add_argument("--profile", default="final", choices=sorted(prototype_video.RENDER_PROFILES))
+    parser.add_argument("--warm", action="store_true", help="keep the on-disk caches instead of starting cold")
+    parser.add_argument("--report", default="bench_report.json", help="JSON report path")
+    args = parser.parse_args()
+
+    runs = []
+    for mode in args.modes:
+        for scene_count in args.scenes:
+            print(f"⏱️ {mode}: {scene_count} scenes...")
+            run = run_case(scene_count, mode, args.profile, args.warm)
+            runs.append(run)
+            print(f"   {run['total_wall_s']:.2f}s total")
+            for name, stage in sorted(run["stages"].items(), key=lambda item: -item[1]["wall_s"]):
+                print(f"   {name:<24} {stage['calls']:>4} calls {stage['wall_s']:>9.3f}s wall "
+                      f"{stage['cpu_s']:>9.3f}s cpu {stage['peak_rss_mb']:>8.1f} MB")
+
+    report = {
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "runs": runs,
+    }
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"📝 Benchmark report written to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# build_geodata.py
+"""
+Build step for the artisan map's state boundaries.
+
+india_states.geojson is really a zip archive holding states_india.geojson.
+This script unpacks it and builds a topology: each shared border becomes a
+single arc. It then writes one quantized, delta-encoded TopoJSON file per
+zoom band plus a manifest:
+
+    python build_geodata.py                       # -> geodata/manifest.json, geodata/states.z*.topo.json
+
+Simplification (Douglas-Peucker) runs on arcs, not on polygons, so
+neighbouring states always share exactly the same simplified border and no
+gaps or overlaps appear. script.js reads the manifest and fetches only the
+level that matches the current zoom.
+"""
+import os
+import json
+import zipfile
+import argparse
+
+import numpy as np
+
+SOURCE_PATH = "india_states.geojson"
+OUTPUT_DIR = "geodata"
+OBJECT_NAME = "states"
+
+# Tolerance is in degrees, roughly half a screen pixel at the band's highest zoom.
+# Quantization is the number of grid steps across the bounding box.
+ZOOM_LEVELS = [
+    {"min_zoom": 0, "max_zoom": 4, "tolerance": 0.04, "quantization": 10_000},
+    {"min_zoom": 5, "max_zoom": 6, "tolerance": 0.01, "quantization": 100_000},
+    {"min_zoom": 7, "max_zoom": 8, "tolerance": 0.0025, "quantization": 100_000},
+    {"min_zoom": 9, "max_zoom": 18, "tolerance": 0.0005, "quantization": 1_000_000},
+]
+
+
+def load_source(path=SOURCE_PATH):
+    """
+    Reads the boundary FeatureCollection, unpacking it first if it is a zip archive.
+    """
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            member = next(name for name in archive.namelist() if name.endswith((".geojson", ".json")))
+            with archive.open(member) as f:
+                return json.load(f)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def state_name(properties):
+    """
+    The source keeps state names in `st_nm` and writes "&" for "and"; the map
+    looks states up by `name` (see artisanData in script.js).
+    """
+    name = properties.get("name") or properties.get("st_nm") or ""
+    return name.replace(" & ", " and ").strip()
+
+
+# -----------------------------------------------------------
+# TOPOLOGY
+# -----------------------------------------------------------
+
+def feature_polygons(geometry):
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+def open_ring(ring):
+    """
+    Returns the ring's points as tuples without the closing duplicate.
+    """
+    points = [tuple(point[:2]) for point in ring]
+    if len(points) > 1 and points[0] == points[-1]:
+        points.pop()
+    # Drop consecutive duplicates; they would break junction detection
+    return [point for i, point in enumerate(points) if point != points[i - 1]] if len(points) > 1 else points
+
+
+def find_junctions(rings):
+    """
+    A point is a junction when rings pass through it with different neighbours,
+    i.e. where a shared border starts or ends.
+    """
+    neighbours = {}
+    junctions = set()
+    for ring in rings:
+        n = len(ring)
+        for i, point in enumerate(ring):
+            pair = frozenset((ring[i - 1], ring[(i + 1) % n]))
+            seen = neighbours.setdefault(point, pair)
+            if seen != pair:
+                junctions.add(point)
+    return junctions
+
+
+def build_topology(features):
+    """
+    Splits every ring into arcs at junctions and stores each arc once.
+
+    Returns (arcs, geometries): arcs is a list of Nx2 float arrays and each
+    geometry is a list of polygons, each a list of rings, each a list of arc
+    indexes (~i meaning arc i reversed), as in TopoJSON.
+    """
+    feature_rings = [[[open_ring(ring) for ring in polygon] for polygon in feature_polygons(feature["geometry"])]
+                     for feature in features]
+    all_rings = [ring for polygons in feature_rings for polygon in polygons for ring in polygon if len(ring) >= 3]
+    junctions = find_junctions(all_rings)
+
+    arcs = []
+    arc_index = {}
+
+    def add_arc(points):
+        key = tuple(points)
+        if key in arc_index:
+            return arc_index[key]
+        reverse_key = key[::-1]
+        if reverse_key in arc_index:
+            return ~arc_index[reverse_key]
+        arc_index[key] = len(arcs)
+        arcs.append(np.array(points, dtype=np.float64))
+        return arc_index[key]
+
+    def ring_arcs(ring):
+        cuts = [i for i, point in enumerate(ring) if point in junctions]
+        if not cuts:
+            # A ring with no shared border: rotate to a canonical start so that
+            # a hole and the enclave filling it still map to the same arc
+            start = min(range(len(ring)), key=ring.__getitem__)
+            rotated = ring[start:] + ring[:start]
+            return [add_arc(rotated + [rotated[0]])]
+        rotated = ring[cuts[0]:] + ring[:cuts[0]]
+        cuts = [i - cuts[0] for i in cuts] + [len(ring)]
+        rotated.append(rotated[0])
+        return [add_arc(rotated[start:end + 1]) for start, end in zip(cuts, cuts[1:])]
+
+    geometries = [
+        [[ring_arcs(ring) for ring in polygon if len(ring) >= 3] for polygon in polygons]
+        for polygons in feature_rings
+    ]
+    return arcs, geometries
+
+
+# -----------------------------------------------------------
+# SIMPLIFICATION AND ENCODING
+# -----------------------------------------------------------
+
+def douglas_peucker(points, tolerance):
+    """
+    Returns a boolean mask of the points kept by Douglas-Peucker. Endpoints are
+    always kept; a closed arc is split at its farthest point first.
+    """
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    if n <= 2:
+        return keep
+    if np.array_equal(points[0], points[-1]):
+        far = int(np.argmax(np.hypot(*(points - points[0]).T)))
+        keep[far] = True
+        stack = [(0, far), (far, n - 1)]
+    else:
+        stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = points[start + 1:end]
+        a, b = points[start], points[end]
+        dx, dy = b - a
+        length = np.hypot(dx, dy)
+        if length == 0:
+            distances = np.hypot(*(segment - a).T)
+        else:
+            distances = np.abs(dx * (segment[:, 1] - a[1]) - dy * (segment[:, 0] - a[0])) / length
+        i = int(np.argmax(distances))
+        if distances[i] > tolerance:
+            mid = start + 1 + i
+            keep[mid] = True
+            stack.append((start, mid))
+            stack.append((mid, end))
+    return keep
+
+
+def quantize_arc(points, origin, scale):
+    """
+    Snaps points to the integer grid, removes repeats and delta-encodes them.
+    """
+    grid = np.round((points - origin) / scale).astype(np.int64)
+    if len(grid) > 2:
+        moved = np.any(grid[1:] != grid[:-1], axis=1)
+        grid = np.vstack([grid[:1], grid[1:][moved]])
+        if len(grid) < 2:
+            grid = np.vstack([grid, grid])
+    deltas = np.vstack([grid[:1], np.diff(grid, axis=0)])
+    return deltas.tolist()
+
+
+def ring_point_count(ring, arc_sizes):
+    # Arcs share their endpoints with the next arc in the ring
+    return sum(arc_sizes[arc if arc >= 0 else ~arc] - 1 for arc in ring) + 1
+
+
+def build_level(arcs, geometries, properties, bbox, tolerance, quantization):
+    """
+    Returns a TopoJSON dict for one zoom band.
+    """
+    simplified = [arc[douglas_peucker(arc, tolerance)] for arc in arcs]
+    arc_sizes = [len(arc) for arc in simplified]
+
+    # Drop rings (islands, lakes) that collapse below a triangle at this tolerance
+    level_geometries = []
+    for polygons, props in zip(geometries, properties):
+        kept = [
+            [ring for ring in polygon if ring_point_count(ring, arc_sizes) >= 4]
+            for polygon in polygons
+            if ring_point_count(polygon[0], arc_sizes) >= 4
+        ]
+        kept = [polygon for polygon in kept if polygon]
+        level_geometries.append({"type": "MultiPolygon", "arcs": kept, "properties": props})
+
+    # Keep only the arcs still referenced and renumber them
+    used = sorted({arc if arc >= 0 else ~arc for geometry in level_geometries
+                   for polygon in geometry["arcs"] for ring in polygon for arc in ring})
+    renumber = {old: new for new, old in enumerate(used)}
+    for geometry in level_geometries:
+        geometry["arcs"] = [[[renumber[arc] if arc >= 0 else ~renumber[~arc] for arc in ring] for ring in polygon]
+                            for polygon in geometry["arcs"]]
+
+    min_x, min_y, max_x, max_y = bbox
+    scale = np.array([(max_x - min_x) / (quantization - 1), (max_y - min_y) / (quantization - 1)])
+    origin = np.array([min_x, min_y])
+    return {
+        "type": "Topology",
+        "bbox": list(bbox),
+        "transform": {"scale": scale.tolist(), "translate": origin.tolist()},
+        "objects": {OBJECT_NAME: {"type": "GeometryCollection", "geometries": level_geometries}},
+        "arcs": [quantize_arc(simplified[i], origin, scale) for i in used],
+    }
+
+
+def build(source_path=SOURCE_PATH, output_dir=OUTPUT_DIR, levels=ZOOM_LEVELS):
+    collection = load_source(source_path)
+    features = [feature for feature in collection["features"] if feature.get("geometry")]
+    print(f"🗺️ Loaded {len(features)} features from {source_path}")
+
+    arcs, geometries = build_topology(features)
+    all_points = np.vstack(arcs)
+    bbox = [*all_points.min(axis=0).tolist(), *all_points.max(axis=0).tolist()]
+    print(f"🔗 Topology: {len(arcs)} arcs, {len(all_points)} points")
+
+    properties = [{"name": state_name(feature.get("properties") or {})} for feature in features]
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {"object": OBJECT_NAME, "bbox": bbox, "levels": []}
+    for index, level in enumerate(levels):
+        topology = build_level(arcs, geometries, properties, bbox, level["tolerance"], level["quantization"])
+        file_name = f"{OBJECT_NAME}.z{index}.topo.json"
+        path = os.path.join(output_dir, file_name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(topology, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        points = sum(len(arc) for arc in topology["arcs"])
+        size = os.path.getsize(path)
+        manifest["levels"].append({**level, "file": file_name, "arcs": len(topology["arcs"]),
+                                   "points": points, "bytes": size})
+        print(f"✅ {file_name}: zoom {level['min_zoom']}-{level['max_zoom']}, {points} points, {size / 1024:.0f} KB")
+
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build simplified, per-zoom TopoJSON for the artisan map.")
+    parser.add_argument("--source", default=SOURCE_PATH, help="GeoJSON file or zip archive containing one")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    args = parser.parse_args()
+    build(args.source, args.output_dir)
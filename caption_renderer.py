@@ -0,0 +1,156 @@
+# caption_renderer.py
+import os
+import json
+import hashlib
+import threading
+from functools import lru_cache
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from instrumentation import span, count
+from disk_cache import evict_files, touch
+
+# Point this at a shared folder to reuse rasterized captions across hosts
+CAPTION_CACHE_DIR = os.getenv("CAPTION_CACHE_DIR", "caption_cache")
+CAPTION_CACHE_MAX_ITEMS = 256  # rasterized captions kept in memory per process
+CAPTION_CACHE_MAX_MB = 512
+CAPTION_CACHE_TTL = 30 * 24 * 60 * 60  # seconds since a caption was last used
+CAPTION_CACHE_EVICT_EVERY = 64  # new captions between eviction sweeps
+
+# ImageMagick font names used in VIDEO_SETTINGS, mapped to TrueType files
+FONT_FILES = {
+    "Arial-Bold": ["arialbd.ttf", "Arial Bold.ttf", "Arial-Bold.ttf", "LiberationSans-Bold.ttf", "DejaVuSans-Bold.ttf"],
+    "Arial": ["arial.ttf", "Arial.ttf", "LiberationSans-Regular.ttf", "DejaVuSans.ttf"],
+}
+
+
+@lru_cache(maxsize=32)
+def load_font(font_name, size):
+    """
+    Loads a TrueType font by path, file name or ImageMagick-style name.
+    Falls back to Pillow's built-in font if nothing matches.
+    """
+    for candidate in [font_name] + FONT_FILES.get(font_name, []):
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    print(f"⚠️ Font '{font_name}' not found, using the default font.")
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1
+        return ImageFont.load_default()
+
+
+class CaptionRenderer:
+    """
+    In-process caption rasterizer with a two-level cache.
+
+    Replaces one ImageMagick subprocess per TextClip with Pillow. Each caption
+    is rendered once per (text, font, size, colors, stroke) and stored as an
+    RGBA .npy file, so repeated captions like "Shop now" are reused by every
+    scene, reel and worker that points at the same cache folder. The folder
+    is bounded by age and size with evict_files() every
+    CAPTION_CACHE_EVICT_EVERY new captions.
+    """
+
+    def __init__(self, cache_dir=CAPTION_CACHE_DIR, max_items=CAPTION_CACHE_MAX_ITEMS,
+                 max_mb=CAPTION_CACHE_MAX_MB, ttl=CAPTION_CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.max_items = max_items
+        self.max_mb = max_mb
+        self.ttl = ttl
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def cache_key(text, font, fontsize, color, stroke_color, stroke_width):
+        payload = json.dumps([text, font, fontsize, color, stroke_color, stroke_width], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def render(self, text, font, fontsize, color, stroke_color=None, stroke_width=0):
+        """
+        Returns (rgb, mask): an HxWx3 uint8 image and an HxW float mask in [0, 1].
+        """
+        key = self.cache_key(text, font, fontsize, color, stroke_color, stroke_width)
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+        if item is not None:
+            count("caption_cache_hit")
+            return item
+
+        npy_path = os.path.join(self.cache_dir, f"{key}.npy")
+        if os.path.exists(npy_path):
+            self.disk_hits += 1
+            count("caption_cache_disk_hit")
+            rgba = np.load(npy_path)
+            touch(npy_path)  # mark as recently used for LRU eviction
+        else:
+            self.misses += 1
+            count("caption_cache_miss")
+            with span("caption_rasterize", backend="pil"):
+                rgba = self._rasterize(text, font, fontsize, color, stroke_color, stroke_width)
+            tmp_path = f"{npy_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, rgba)
+            os.replace(tmp_path, npy_path)
+            if (self.misses - 1) % CAPTION_CACHE_EVICT_EVERY == 0:
+                evict_files(self.cache_dir, self.max_mb, self.ttl, keep=[npy_path],
+                            counter="caption_cache_evicted")
+
+        item = (rgba[:, :, :3], rgba[:, :, 3] / 255.0)
+        with self._lock:
+            self._items[key] = item
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return item
+
+    @staticmethod
+    def _rasterize(text, font, fontsize, color, stroke_color, stroke_width):
+        pil_font = load_font(font, fontsize)
+        stroke_width = stroke_width if stroke_color else 0
+
+        measure = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+        left, top, right, bottom = measure.multiline_textbbox(
+            (0, 0), text, font=pil_font, align="center", stroke_width=stroke_width
+        )
+        size = (max(1, right - left), max(1, bottom - top))
+
+        canvas = Image.new("RGBA", size, (0, 0, 0, 0))
+        ImageDraw.Draw(canvas).multiline_text(
+            (-left, -top), text, font=pil_font, fill=color, align="center",
+            stroke_width=stroke_width, stroke_fill=stroke_color,
+        )
+        return np.asarray(canvas, dtype=np.uint8)
+
+    def clear(self):
+        """
+        Drops the in-memory captions; the .npy files stay on disk.
+        """
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
+
+
+_renderer = None
+
+
+def get_caption_renderer():
+    """
+    Returns this process's CaptionRenderer.
+    """
+    global _renderer
+    if _renderer is None:
+        _renderer = CaptionRenderer()
+    return _renderer
@@ -0,0 +1,251 @@
+# discount_rules.py
+"""
+Discount campaigns for BargainingChatbot, loaded from discount_rules.json.
+
+Each rule has an id, a discount fraction, the catalog message that announces
+it, an optional date window ("months": [12], or "start"/"end" as "MM-DD",
+wrapping over New Year when start > end), the customer segments it targets
+("*" for all), optional "products" and "stackable": false for a rule that
+must not be combined with others. Rules apply in file order and multiply
+the price; the combined factor is clamped so the total discount never
+exceeds max_total_discount. Customers below every segment threshold
+(including negative loyalty points) belong to the lowest segment.
+
+Compilation expands the rules into a table indexed by (day of year,
+segment), so an accepted offer costs one segment lookup and one table
+lookup. The result per language, factor and announcement messages, is then
+kept in a bounded LRU. Hits per rule are counted for campaign reports:
+
+    python discount_rules.py --date 12-25 --loyalty-points 100
+    python discount_rules.py --calendar
+"""
+import os
+import json
+import time
+import bisect
+import argparse
+from collections import Counter, OrderedDict
+
+DISCOUNT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "discount_rules.json")
+RESULT_CACHE_SIZE = 4096  # (day, segment, product, language) results kept in memory
+DAYS_IN_YEAR = 366  # indexed on a leap year so 29 February has its own slot
+MONTH_DAYS = (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+MONTH_START = [sum(MONTH_DAYS[:month]) for month in range(12)]
+
+
+def day_of_year(month, day):
+    """
+    0-based day index on a leap-year calendar.
+    """
+    return MONTH_START[month - 1] + day - 1
+
+
+def month_day(day):
+    month = bisect.bisect_right(MONTH_START, day) - 1
+    return f"{month + 1:02d}-{day - MONTH_START[month] + 1:02d}"
+
+
+def parse_month_day(text):
+    month, day = (int(part) for part in text.split("-"))
+    if not 1 <= month <= 12 or not 1 <= day <= MONTH_DAYS[month - 1]:
+        raise ValueError(f"invalid date '{text}', expected MM-DD")
+    return day_of_year(month, day)
+
+
+class DiscountRule:
+    __slots__ = ("id", "discount", "message", "days", "segments", "products", "stackable")
+
+    def __init__(self, spec, segment_names, default_formats=None):
+        self.id = spec["id"]
+        self.discount = float(spec["discount"])
+        if not 0 < self.discount < 1:
+            raise ValueError(f"rule '{self.id}': discount must be between 0 and 1")
+        self.message = spec["message"]
+        if default_formats is not None and not callable(default_formats.get(self.message)):
+            raise ValueError(f"rule '{self.id}': unknown catalog message '{self.message}'")
+        self.products = frozenset(spec["products"]) if spec.get("products") else None
+        self.stackable = spec.get("stackable", True)
+
+        if "months" in spec:
+            self.days = [day for month in spec["months"]
+                         for day in range(MONTH_START[month - 1], MONTH_START[month - 1] + MONTH_DAYS[month - 1])]
+        elif "start" in spec or "end" in spec:
+            start, end = parse_month_day(spec.get("start", "01-01")), parse_month_day(spec.get("end", "12-31"))
+            self.days = (list(range(start, end + 1)) if start <= end
+                         else list(range(start, DAYS_IN_YEAR)) + list(range(0, end + 1)))
+        else:
+            self.days = range(DAYS_IN_YEAR)
+
+        segments = spec.get("segments", ["*"])
+        unknown = set(segments) - set(segment_names) - {"*"}
+        if unknown:
+            raise ValueError(f"rule '{self.id}': unknown segments {sorted(unknown)}")
+        self.segments = segment_names if "*" in segments else [name for name in segment_names if name in segments]
+
+
+class DiscountEngine:
+    """
+    Discount rules compiled into a (day of year, segment) -> rules table.
+
+    `default_formats` is the default language's template formatters: every
+    rule message must be one of its keys, and it stands in for languages
+    that lack a message.
+    """
+
+    def __init__(self, config, default_formats=None):
+        # Segments are chosen by the highest min_loyalty_points the customer reaches
+        segments = sorted(config.get("segments", [{"name": "all", "min_loyalty_points": 0}]),
+                          key=lambda segment: segment["min_loyalty_points"])
+        self.segment_names = [segment["name"] for segment in segments]
+        self.segment_thresholds = [segment["min_loyalty_points"] for segment in segments]
+        self.max_total_discount = float(config.get("max_total_discount", 1.0))
+        self.default_formats = default_formats or {}
+        self.rules = [DiscountRule(spec, self.segment_names, default_formats) for spec in config.get("rules", [])]
+
+        table = [[[] for _ in self.segment_names] for _ in range(DAYS_IN_YEAR)]
+        for rule in self.rules:
+            for day in rule.days:
+                for segment in rule.segments:
+                    table[day][self.segment_names.index(segment)].append(rule)
+        self.table = tuple(tuple(tuple(rules) for rules in day) for day in table)
+        self.uses_products = any(rule.products is not None for rule in self.rules)
+        self.hits = Counter()
+        self._results = OrderedDict()
+        self._today = (None, None)
+
+    @classmethod
+    def from_file(cls, path=DISCOUNT_RULES_PATH, default_formats=None):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), default_formats)
+
+    def segment(self, loyalty_points):
+        """
+        Index of the customer's segment; below every threshold is the lowest one.
+        """
+        return max(bisect.bisect_right(self.segment_thresholds, loyalty_points) - 1, 0)
+
+    def today(self):
+        # Re-derive the day index only when the date changes
+        now = time.localtime()
+        key = (now.tm_year, now.tm_yday)
+        if self._today[0] != key:
+            self._today = (key, day_of_year(now.tm_mon, now.tm_mday))
+        return self._today[1]
+
+    def rules_for(self, day, segment, product=None):
+        """
+        Rules that apply, in order, after product filters and stacking.
+        """
+        applied = []
+        for rule in self.table[day][segment]:
+            if rule.products is not None and product not in rule.products:
+                continue
+            if applied and not rule.stackable:
+                continue
+            applied.append(rule)
+            if not rule.stackable:
+                break
+        return tuple(applied)
+
+    def price_factor(self, rules):
+        """
+        Combined price multiplier of `rules`, clamped to max_total_discount.
+        """
+        factor = 1.0
+        for rule in rules:
+            factor *= 1 - rule.discount
+        return max(factor, 1 - self.max_total_discount)
+
+    def apply(self, loyalty_points, language, formats, product=None, day=None):
+        """
+        Returns (price factor, announcement messages) for an accepted offer.
+        `formats` is the language's template formatters from the catalog; the
+        rendered messages are cached per (day, segment, product, language).
+        """
+        day = self.today() if day is None else day
+        segment = self.segment(loyalty_points)
+        product = product if self.uses_products else None
+        key = (day, segment, product, language)
+        result = self._results.get(key)
+        if result is None:
+            rules = self.rules_for(day, segment, product)
+            messages = tuple(self._announce(formats, rule) for rule in rules)
+            result = (self.price_factor(rules), messages, tuple(rule.id for rule in rules))
+            self._results[key] = result
+            while len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        else:
+            self._results.move_to_end(key)
+        self.hits.update(result[2])
+        return result[0], result[1]
+
+    def _announce(self, formats, rule):
+        # Falls back to the default language, then to the bare message key
+        format_message = formats.get(rule.message) or self.default_formats.get(rule.message)
+        return format_message(rule.discount * 100) if callable(format_message) else rule.message
+
+    def discount_factors(self, day, loyalty_points):
+        """
+        Vectorized price factors for a day and a NumPy array of loyalty points
+        (used by negotiation_simulator.py; hits are not counted).
+        """
+        import numpy as np
+        factors = np.array([self.price_factor(self.rules_for(day, segment))
+                            for segment in range(len(self.segment_names))])
+        segments = np.maximum(np.searchsorted(self.segment_thresholds, loyalty_points, side="right") - 1, 0)
+        return factors[segments]
+
+    def stats(self):
+        return dict(self.hits)
+
+
+_engine = None
+
+
+def get_discount_rules():
+    """
+    Returns the process-wide DiscountEngine compiled from discount_rules.json,
+    with rule messages checked against the chatbot's catalog.
+    """
+    global _engine
+    if _engine is None:
+        _engine = DiscountEngine.from_file(default_formats=catalog_formats())
+    return _engine
+
+
+def catalog_formats():
+    """
+    Default-language template formatters from the chatbot's message catalog.
+    """
+    from bargaining_chatbot import CATALOG, DEFAULT_LANGUAGE  # imported here: bargaining_chatbot imports this module
+    return CATALOG.formatters[DEFAULT_LANGUAGE]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the compiled discount rules.")
+    parser.add_argument("--config", default=DISCOUNT_RULES_PATH)
+    parser.add_argument("--date", help="MM-DD to evaluate (default: today)")
+    parser.add_argument("--loyalty-points", type=float, default=0)
+    parser.add_argument("--product")
+    parser.add_argument("--calendar", action="store_true", help="list the active rules for each date range")
+    args = parser.parse_args()
+
+    engine = DiscountEngine.from_file(args.config, catalog_formats())
+    if args.calendar:
+        start, previous = 0, None
+        for day in range(DAYS_IN_YEAR + 1):
+            current = None if day == DAYS_IN_YEAR else [
+                [rule.id for rule in rules] for rules in engine.table[day]
+            ]
+            if current != previous and previous is not None:
+                print(f"📅 {month_day(start)} .. {month_day(day - 1)}: "
+                      + "; ".join(f"{name}: {', '.join(ids) or '-'}"
+                                  for name, ids in zip(engine.segment_names, previous)))
+            if current != previous:
+                start, previous = day, current
+    else:
+        day = parse_month_day(args.date) if args.date else engine.today()
+        rules = engine.rules_for(day, engine.segment(args.loyalty_points), args.product)
+        for rule in rules:
+            print(f"🏷️ {rule.id}: {rule.discount:.0%}")
+        print(f"💰 Price factor {engine.price_factor(rules):.4f}" if rules else "No discounts apply.")
@@ -0,0 +1,88 @@
+# disk_cache.py
+import os
+import time
+
+from instrumentation import count
+
+DISK_CACHE_GRACE = 60 * 60  # entries used this recently may still be read by another process
+
+
+def is_temp_file(name):
+    """
+    True for the "<name>.<pid>...tmp" files the caches write before os.replace().
+    """
+    return name.endswith(".tmp") or ".tmp." in name
+
+
+def evict_files(directory, max_mb, ttl, grace=DISK_CACHE_GRACE, keep=(), counter=None):
+    """
+    Bounds a folder of cached files by age and size.
+
+    Files sharing the part of their name before the first "." (a cache key,
+    e.g. <key>.wav and <key>.json) form one entry, aged by its most recent
+    mtime. Entries unused for longer than `ttl` are deleted, then the least
+    recently used ones until the folder fits in `max_mb`. Entries in `keep`
+    and anything used within `grace` seconds are never deleted; temporary
+    files left by interrupted writes are removed after `grace`.
+    Returns the number of entries deleted.
+    """
+    keep = {os.path.abspath(path) for path in keep}
+    now = time.time()
+    entries = {}
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if is_temp_file(name):
+            if now - stat.st_mtime > grace:
+                _silent_remove(path)
+            continue
+        entry = entries.setdefault(name.split(".", 1)[0], {"mtime": 0.0, "size": 0, "paths": [], "pinned": False})
+        entry["mtime"] = max(entry["mtime"], stat.st_mtime)
+        entry["size"] += stat.st_size
+        entry["paths"].append(path)
+        entry["pinned"] |= os.path.abspath(path) in keep
+
+    evicted = []
+    candidates = []
+    total = 0
+    for entry in entries.values():
+        age = now - entry["mtime"]
+        if not entry["pinned"] and age >= grace and age > ttl:
+            evicted.append(entry)
+            continue
+        total += entry["size"]
+        if not entry["pinned"] and age >= grace:
+            candidates.append(entry)
+
+    for entry in sorted(candidates, key=lambda entry: entry["mtime"]):
+        if total <= max_mb * 2 ** 20:
+            break
+        evicted.append(entry)
+        total -= entry["size"]
+
+    for entry in evicted:
+        for path in entry["paths"]:
+            _silent_remove(path)
+    if counter and evicted:
+        count(counter, len(evicted))
+    return len(evicted)
+
+
+def touch(path):
+    """
+    Marks a cached file as recently used for LRU eviction.
+    """
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _silent_remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
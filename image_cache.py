@@ -0,0 +1,134 @@
+# image_cache.py
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+from instrumentation import span, count
+from disk_cache import evict_files, touch
+
+IMAGE_CACHE_DIR = "image_cache"
+IMAGE_CACHE_MAX_FRAMES = 32  # decoded frames kept open per process
+IMAGE_CACHE_MAX_MB = 2048
+IMAGE_CACHE_TTL = 30 * 24 * 60 * 60  # seconds since a frame was last used
+IMAGE_CACHE_EVICT_EVERY = 16  # new .npy files between eviction sweeps
+
+
+def resized_size(image_path, height):
+    """
+    Returns the (width, height) of an image resized to `height`, reading only its header.
+    Uses the same rounding as MoviePy's resize(height=...).
+    """
+    with Image.open(image_path) as img:
+        w, h = img.size
+    return int(w * height / h), height
+
+
+class ImageCache:
+    """
+    Cache of decoded, resized scene backgrounds.
+
+    Frames are stored as .npy files keyed by (path, mtime, size, target height)
+    and opened memory-mapped and read-only, so every scene, reel and worker
+    process that uses the same image shares one buffer from the page cache
+    instead of decoding and resampling the JPEG again.
+
+    Every edited image and render height is a new file, so the folder is
+    bounded with evict_files(): on the first write and every
+    IMAGE_CACHE_EVICT_EVERY writes, files unused for `ttl` seconds and then
+    the least recently used ones beyond `max_mb` are deleted.
+    """
+
+    def __init__(self, cache_dir=IMAGE_CACHE_DIR, max_frames=IMAGE_CACHE_MAX_FRAMES,
+                 max_mb=IMAGE_CACHE_MAX_MB, ttl=IMAGE_CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.max_frames = max_frames
+        self.max_mb = max_mb
+        self.ttl = ttl
+        self._writes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def cache_key(image_path, height):
+        stat = os.stat(image_path)
+        raw = f"{os.path.abspath(image_path)}|{stat.st_mtime_ns}|{stat.st_size}|{height}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get_frame(self, image_path, height):
+        """
+        Returns the image resized to `height` as a read-only HxWx3 uint8 array.
+        """
+        key = self.cache_key(image_path, height)
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+                self.hits += 1
+        if frame is not None:
+            count("image_cache_hit")
+            return frame
+
+        npy_path = os.path.join(self.cache_dir, f"{key}.npy")
+        if os.path.exists(npy_path):
+            self.disk_hits += 1
+            count("image_cache_disk_hit")
+            touch(npy_path)
+        else:
+            self.misses += 1
+            count("image_cache_miss")
+            with span("image_load"):
+                self._decode_to_disk(image_path, height, npy_path)
+            if self._writes % IMAGE_CACHE_EVICT_EVERY == 0:
+                evict_files(self.cache_dir, self.max_mb, self.ttl, keep=[npy_path], counter="image_cache_evicted")
+            self._writes += 1
+        frame = np.load(npy_path, mmap_mode="r")
+
+        with self._lock:
+            self._frames[key] = frame
+            while len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+        return frame
+
+    @staticmethod
+    def _decode_to_disk(image_path, height, npy_path):
+        with Image.open(image_path) as img:
+            img = img.convert("RGB")
+            width = int(img.width * height / img.height)
+            frame = np.asarray(img.resize((width, height), Image.LANCZOS), dtype=np.uint8)
+
+        # Write under a temporary name so concurrent workers never read a partial file
+        tmp_path = f"{npy_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, frame)
+        os.replace(tmp_path, npy_path)
+
+    def clear(self):
+        """
+        Drops the in-memory frames; the .npy files stay on disk.
+        """
+        with self._lock:
+            self._frames.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
+
+
+_cache = None
+
+
+def get_image_cache():
+    """
+    Returns this process's ImageCache.
+    """
+    global _cache
+    if _cache is None:
+        _cache = ImageCache()
+    return _cache
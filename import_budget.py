@@ -0,0 +1,70 @@
+# import_budget.py
+"""
+Measures how long it takes to import the pipeline modules in a fresh
+interpreter (`python -X importtime`) and checks them against a budget.
+
+    python import_budget.py                # all modules, exit 1 if any is over budget
+    python import_budget.py main --top 10  # also list the slowest imports
+"""
+import sys
+import argparse
+import subprocess
+
+# Milliseconds of cumulative import time allowed per module
+IMPORT_BUDGET_MS = {
+    "speech_recognition_bot": 150,
+    "translation": 50,
+    "storygenerator": 250,
+    "main": 300,
+    "instrumentation": 50,
+}
+
+
+def measure_import(module, python=sys.executable):
+    """
+    Imports `module` in a new interpreter and returns (total_ms, [(ms, name), ...])
+    where the list holds the cumulative time of every module it pulled in.
+    """
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    imports = []
+    total_ms = None
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        ms = int(cumulative) / 1000
+        imports.append((ms, name))
+        if name == module:
+            total_ms = ms
+    return total_ms, sorted(imports, reverse=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check module import times against a budget.")
+    parser.add_argument("modules", nargs="*", default=sorted(IMPORT_BUDGET_MS), help="modules to measure")
+    parser.add_argument("--top", type=int, default=0, help="show the N slowest imports of each module")
+    args = parser.parse_args()
+
+    over_budget = False
+    for module in args.modules:
+        try:
+            total_ms, imports = measure_import(module)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            over_budget = True
+            continue
+        budget = IMPORT_BUDGET_MS.get(module)
+        within = budget is None or total_ms <= budget
+        over_budget = over_budget or not within
+        print(f"{'✅' if within else '❌'} {module:<24}{total_ms:>9.1f} ms"
+              + (f"  (budget {budget} ms)" if budget is not None else ""))
+        for ms, name in imports[1:args.top + 1]:
+            print(f"    {ms:>9.1f} ms  {name}")
+
+    sys.exit(1 if over_budget else 0)
@@ -0,0 +1,199 @@
+# instrumentation.py
+"""
+Lightweight timing spans and counters for the reel pipeline.
+
+    from instrumentation import span, count
+
+    with span("tts"):
+        ...
+    count("voiceover_cache_hit")
+
+Every process keeps its own in-memory latency samples and counters. Set
+METRICS_JSONL (or call metrics.configure) to also append each span and
+counter update as a JSON line; worker processes inherit the variable, so a
+whole batch run lands in one file that `python instrumentation.py FILE`
+turns into p50/p99 per stage, as a table or in Prometheus text format.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from contextlib import contextmanager
+from collections import Counter
+
+METRICS_JSONL = os.getenv("METRICS_JSONL")
+MAX_SAMPLES_PER_SPAN = 10000  # reservoir size used for the quantiles
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Metrics:
+    """
+    Collects span durations (reservoir-sampled) and counters for one process.
+    """
+
+    def __init__(self, jsonl_path=METRICS_JSONL, max_samples=MAX_SAMPLES_PER_SPAN):
+        self.jsonl_path = jsonl_path
+        self.max_samples = max_samples
+        self.counters = Counter()
+        self._samples = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def configure(self, jsonl_path=None):
+        """
+        Sets the JSON-lines sink for this process and any worker processes it starts.
+        """
+        self.jsonl_path = jsonl_path
+        if jsonl_path:
+            os.environ["METRICS_JSONL"] = jsonl_path
+        else:
+            os.environ.pop("METRICS_JSONL", None)
+
+    def _emit(self, record):
+        if not self.jsonl_path:
+            return
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock, open(self.jsonl_path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            count, total = self._totals.get(name, (0, 0.0))
+            count += 1
+            self._totals[name] = (count, total + seconds)
+            samples = self._samples.setdefault(name, [])
+            if len(samples) < self.max_samples:
+                samples.append(seconds)
+            else:
+                slot = random.randrange(count)
+                if slot < self.max_samples:
+                    samples[slot] = seconds
+
+    @contextmanager
+    def span(self, name, **labels):
+        """
+        Times the enclosed block and records it under `name`.
+        """
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            self.observe(name, seconds)
+            self._emit({"ts": time.time(), "pid": os.getpid(), "span": name,
+                        "seconds": round(seconds, 6), "error": error, **labels})
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+        self._emit({"ts": time.time(), "pid": os.getpid(), "counter": name, "value": value})
+
+    def summary(self):
+        """
+        Returns {span: {count, sum, p50, p90, p99, max}} and the counters.
+        """
+        with self._lock:
+            spans = {
+                name: _summarize(self._samples[name], *self._totals[name])
+                for name in self._samples
+            }
+            return {"spans": spans, "counters": dict(self.counters)}
+
+    def prometheus_text(self):
+        return prometheus_text(self.summary())
+
+
+def current_rss():
+    """
+    Returns the resident set size of this process in bytes, or None if unavailable.
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _summarize(samples, count, total):
+    ordered = sorted(samples)
+    stats = {"count": count, "sum": round(total, 6)}
+    for q in QUANTILES:
+        stats[f"p{round(q * 100)}"] = round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 6)
+    stats["max"] = round(ordered[-1], 6)
+    return stats
+
+
+def prometheus_text(summary, prefix="reel"):
+    """
+    Renders a summary() dict in the Prometheus text exposition format.
+    """
+    lines = [
+        f"# HELP {prefix}_span_seconds Duration of pipeline stages.",
+        f"# TYPE {prefix}_span_seconds summary",
+    ]
+    for name, stats in sorted(summary["spans"].items()):
+        for q in QUANTILES:
+            lines.append(f'{prefix}_span_seconds{{span="{name}",quantile="{q}"}} {stats[f"p{round(q * 100)}"]}')
+        lines.append(f'{prefix}_span_seconds_sum{{span="{name}"}} {stats["sum"]}')
+        lines.append(f'{prefix}_span_seconds_count{{span="{name}"}} {stats["count"]}')
+    lines += [
+        f"# HELP {prefix}_events_total Pipeline event counters (cache hits, misses, ...).",
+        f"# TYPE {prefix}_events_total counter",
+    ]
+    for name, value in sorted(summary["counters"].items()):
+        lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def summarize_jsonl(path):
+    """
+    Aggregates a JSON-lines metrics file written by any number of processes.
+    """
+    collector = Metrics(jsonl_path=None, max_samples=sys.maxsize)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "span" in record:
+                collector.observe(record["span"], record["seconds"])
+            elif "counter" in record:
+                collector.counters[record["counter"]] += record["value"]
+    return collector.summary()
+
+
+metrics = Metrics()
+span = metrics.span
+count = metrics.count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a METRICS_JSONL file.")
+    parser.add_argument("path", help="JSON-lines file written by the pipeline")
+    parser.add_argument("--format", choices=["table", "json", "prometheus"], default="table")
+    args = parser.parse_args()
+
+    summary = summarize_jsonl(args.path)
+    if args.format == "json":
+        print(json.dumps(summary, indent=2))
+    elif args.format == "prometheus":
+        print(prometheus_text(summary), end="")
+    else:
+        print(f"{'span':<24}{'count':>8}{'p50 (s)':>12}{'p90 (s)':>12}{'p99 (s)':>12}{'max (s)':>12}")
+        for name, stats in sorted(summary["spans"].items()):
+            print(f"{name:<24}{stats['count']:>8}{stats['p50']:>12.4f}{stats['p90']:>12.4f}"
+                  f"{stats['p99']:>12.4f}{stats['max']:>12.4f}")
+        for name, value in sorted(summary["counters"].items()):
+            print(f"📊 {name}: {value}")
@@ -0,0 +1,369 @@
+# job_queue.py
+"""
+Durable, SQLite-backed queue for reel generation jobs.
+
+Every job moves through the stages script -> voiceover -> scenes -> encode.
+After each stage the artifact paths are written to the database, so a job
+whose worker died (its lease expired) is picked up by another worker and
+resumes from the last completed stage instead of calling Gemini, TTS or the
+encoder again. While a stage runs, a heartbeat thread keeps renewing the
+lease, so a long render is never reclaimed from a live worker.
+
+    python job_queue.py enqueue artisans.jsonl
+    python job_queue.py work --workers 4
+    python job_queue.py status
+"""
+import os
+import json
+import time
+import socket
+import sqlite3
+import argparse
+import threading
+import multiprocessing
+
+from storygenerator import generate_script
+from voiceover_service import get_voiceover_service
+from prototype_video import (OUTPUT_DIR, RENDER_PROFILES, render_segments, concat_segments,
+                             profile_output_filename)
+from instrumentation import span, count
+
+QUEUE_DB = "reel_jobs.db"
+ARTIFACT_DIR = "job_artifacts"
+STAGES = ("script", "voiceover", "scenes", "encode")
+LEASE_SECONDS = 30 * 60  # a running job is reclaimed once its lease runs out
+HEARTBEAT_SECONDS = LEASE_SECONDS / 3
+MAX_ATTEMPTS = 3
+POLL_INTERVAL = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    artisan_info TEXT NOT NULL,
+    images TEXT NOT NULL,
+    output_filename TEXT NOT NULL,
+    profile TEXT NOT NULL DEFAULT 'final',
+    stage TEXT NOT NULL DEFAULT 'script',
+    status TEXT NOT NULL DEFAULT 'pending',
+    artifacts TEXT NOT NULL DEFAULT '{}',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_until);
+"""
+
+
+class JobQueue:
+    """
+    Reel jobs stored in SQLite (WAL mode, safe for several worker processes).
+
+    `stage` is the next stage to run and `status` is one of pending, running,
+    done or failed.
+    """
+
+    def __init__(self, db_path=QUEUE_DB):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def enqueue(self, artisan_info, images, output_filename, profile="final"):
+        now = time.time()
+        cur = self.conn.execute(
+            "INSERT INTO jobs (artisan_info, images, output_filename, profile, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (json.dumps(artisan_info, ensure_ascii=False), json.dumps(images), output_filename, profile, now, now),
+        )
+        return cur.lastrowid
+
+    def claim(self, worker_id):
+        """
+        Atomically takes the oldest pending job, or a running job whose lease expired.
+        Returns the job row as a dict, or None when there is nothing to do.
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT * FROM jobs WHERE status = 'pending' OR (status = 'running' AND lease_until < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            if row["status"] == "running":
+                print(f"♻️ Reclaiming job {row['id']} from {row['worker']} at stage '{row['stage']}'")
+                count("job_reclaimed")
+            self.conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, updated_at = ? WHERE id = ?",
+                (worker_id, now + LEASE_SECONDS, now, row["id"]),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        job = self._to_dict(row)
+        job["worker"] = worker_id
+        return job
+
+    def renew(self, job_id, worker_id):
+        """
+        Extends the lease of a running job. Returns False if the job is no
+        longer held by `worker_id` (it was reclaimed after a missed renewal).
+        """
+        now = time.time()
+        cur = self.conn.execute(
+            "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (now + LEASE_SECONDS, now, job_id, worker_id),
+        )
+        return cur.rowcount == 1
+
+    def checkpoint(self, job_id, worker_id, next_stage, artifacts):
+        """
+        Records a completed stage and renews the lease. Returns False, and
+        changes nothing, if the job is no longer held by `worker_id`.
+        """
+        now = time.time()
+        status = "done" if next_stage == "done" else "running"
+        cur = self.conn.execute(
+            "UPDATE jobs SET stage = ?, status = ?, artifacts = ?, lease_until = ?, error = NULL, updated_at = ? "
+            "WHERE id = ? AND worker = ? AND status = 'running'",
+            (next_stage, status, json.dumps(artifacts, ensure_ascii=False), now + LEASE_SECONDS, now,
+             job_id, worker_id),
+        )
+        return cur.rowcount == 1
+
+    def fail(self, job_id, worker_id, error):
+        """
+        Puts the job back in the queue at the same stage, or marks it failed
+        after MAX_ATTEMPTS. Returns False, and changes nothing, if the job is
+        no longer held by `worker_id`.
+        """
+        now = time.time()
+        cur = self.conn.execute(
+            "UPDATE jobs SET attempts = attempts + 1, error = ?, updated_at = ?, lease_until = NULL, "
+            "status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END "
+            "WHERE id = ? AND worker = ? AND status = 'running'",
+            (error, now, MAX_ATTEMPTS, job_id, worker_id),
+        )
+        return cur.rowcount == 1
+
+    def retry_failed(self):
+        cur = self.conn.execute(
+            "UPDATE jobs SET status = 'pending', attempts = 0, updated_at = ? WHERE status = 'failed'",
+            (time.time(),),
+        )
+        return cur.rowcount
+
+    def counts(self):
+        rows = self.conn.execute("SELECT status, stage, COUNT(*) AS n FROM jobs GROUP BY status, stage").fetchall()
+        return [(row["status"], row["stage"], row["n"]) for row in rows]
+
+    @staticmethod
+    def _to_dict(row):
+        job = dict(row)
+        for field in ("artisan_info", "images", "artifacts"):
+            job[field] = json.loads(job[field])
+        return job
+
+
+# -----------------------------------------------------------
+# STAGES
+# -----------------------------------------------------------
+
+def _artifact_dir(job):
+    path = os.path.join(ARTIFACT_DIR, str(job["id"]))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _load_scenes(artifacts):
+    with open(artifacts["script"], encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_script_stage(job, artifacts):
+    scenes_data = generate_script(**job["artisan_info"])
+    if not scenes_data:
+        raise RuntimeError("no valid script")
+    script_path = os.path.join(_artifact_dir(job), "script.json")
+    with open(script_path, "w", encoding="utf-8") as f:
+        json.dump(scenes_data, f, ensure_ascii=False, indent=2)
+    artifacts["script"] = script_path
+
+
+def _voiceover_paths(artifacts):
+    # Missing files (e.g. a cleaned cache folder) are synthesized again by the scenes stage
+    return [voiceover["path"] if os.path.exists(voiceover["path"]) else None
+            for voiceover in artifacts.get("voiceovers", [])] or None
+
+
+def run_voiceover_stage(job, artifacts):
+    service = get_voiceover_service()
+    artifacts["voiceovers"] = [
+        dict(zip(("path", "duration"), service.synthesize(scene.get("voiceover", ""))))
+        for scene in _load_scenes(artifacts)
+    ]
+
+
+def run_scenes_stage(job, artifacts):
+    # Segments are content-addressed, so a resumed job only renders the ones it had not finished
+    segment_paths = render_segments(_load_scenes(artifacts), job["images"], incremental=True,
+                                    settings=RENDER_PROFILES[job["profile"]],
+                                    voiceover_paths=_voiceover_paths(artifacts))
+    if not segment_paths:
+        raise RuntimeError("scene rendering failed")
+    artifacts["segments"] = segment_paths
+
+
+def run_encode_stage(job, artifacts):
+    settings = RENDER_PROFILES[job["profile"]]
+    reel_path = os.path.join(OUTPUT_DIR, profile_output_filename(job["output_filename"], job["profile"]))
+    concat_segments(artifacts["segments"], reel_path, music_path=settings["music_path"],
+                    music_volume=settings["music_volume"], audio_codec=settings["audio_codec"])
+    artifacts["reel"] = reel_path
+
+
+STAGE_RUNNERS = {
+    "script": run_script_stage,
+    "voiceover": run_voiceover_stage,
+    "scenes": run_scenes_stage,
+    "encode": run_encode_stage,
+}
+
+
+# -----------------------------------------------------------
+# WORKERS
+# -----------------------------------------------------------
+
+class LeaseHeartbeat:
+    """
+    Renews a job's lease every HEARTBEAT_SECONDS from a background thread
+    while a stage runs. Uses its own connection, as sqlite3 connections
+    belong to the thread that opened them. `lost` is set once a renewal
+    finds the job reclaimed by another worker.
+    """
+
+    def __init__(self, db_path, job_id, worker_id, interval=HEARTBEAT_SECONDS):
+        self.db_path = db_path
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        queue = JobQueue(self.db_path)
+        try:
+            while not self._stop.wait(self.interval):
+                if not queue.renew(self.job_id, self.worker_id):
+                    self.lost.set()
+                    return
+        finally:
+            queue.conn.close()
+
+
+def process_job(queue, job):
+    """
+    Runs the job's remaining stages, checkpointing after each one.
+    Stops without writing anything once the job's lease has been lost, so
+    the worker that reclaimed it keeps sole ownership.
+    """
+    artifacts = job["artifacts"]
+    stage = job["stage"]
+    while stage != "done":
+        heartbeat = LeaseHeartbeat(queue.db_path, job["id"], job["worker"])
+        try:
+            with heartbeat, span("job_stage", stage=stage):
+                STAGE_RUNNERS[stage](job, artifacts)
+        except Exception as e:
+            if heartbeat.lost.is_set() or not queue.fail(job["id"], job["worker"], f"{stage}: {e}"):
+                print(f"⚠️ Job {job['id']} lost its lease at stage '{stage}', dropping it")
+                return False
+            print(f"❌ Job {job['id']} failed at stage '{stage}': {e}")
+            return False
+        stage = STAGES[STAGES.index(stage) + 1] if stage != STAGES[-1] else "done"
+        if heartbeat.lost.is_set() or not queue.checkpoint(job["id"], job["worker"], stage, artifacts):
+            print(f"⚠️ Job {job['id']} lost its lease before stage '{stage}', dropping it")
+            return False
+    print(f"✅ Job {job['id']} done: {artifacts['reel']}")
+    return True
+
+
+def run_worker(db_path=QUEUE_DB, worker_id=None, poll_interval=POLL_INTERVAL, exit_when_idle=False):
+    """
+    Claims and processes jobs until stopped (or until the queue is empty with exit_when_idle).
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    queue = JobQueue(db_path)
+    print(f"👷 Worker {worker_id} started")
+    while True:
+        job = queue.claim(worker_id)
+        if job is None:
+            if exit_when_idle:
+                return
+            time.sleep(poll_interval)
+            continue
+        print(f"🎬 Job {job['id']} ({job['artisan_info']['artisan_name']}) from stage '{job['stage']}'")
+        process_job(queue, job)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Durable reel generation queue.")
+    parser.add_argument("--db", default=QUEUE_DB, help="SQLite database path")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_cmd = commands.add_parser("enqueue", help="add every record of a JSONL/CSV manifest")
+    enqueue_cmd.add_argument("manifest")
+    enqueue_cmd.add_argument("--preview", action="store_true", help="render preview-profile reels")
+
+    work_cmd = commands.add_parser("work", help="process jobs")
+    work_cmd.add_argument("--workers", type=int, default=1, help="worker processes to start")
+    work_cmd.add_argument("--exit-when-idle", action="store_true", help="stop once the queue is empty")
+
+    commands.add_parser("status", help="show job counts by status and stage")
+    commands.add_parser("retry-failed", help="requeue failed jobs at the stage they failed")
+
+    args = parser.parse_args()
+    queue = JobQueue(args.db)
+
+    if args.command == "enqueue":
+        from main import load_manifest
+        jobs = load_manifest(args.manifest)
+        for job in jobs:
+            queue.enqueue(job["artisan_info"], job["images"], job["output_filename"],
+                          profile="preview" if args.preview else "final")
+        print(f"📥 Enqueued {len(jobs)} jobs")
+    elif args.command == "work":
+        if args.workers == 1:
+            run_worker(args.db, exit_when_idle=args.exit_when_idle)
+        else:
+            processes = [
+                multiprocessing.Process(target=run_worker, args=(args.db,),
+                                        kwargs={"exit_when_idle": args.exit_when_idle})
+                for _ in range(args.workers)
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+    elif args.command == "status":
+        for status, stage, n in queue.counts():
+            print(f"{status:<8} {stage:<10} {n}")
+    elif args.command == "retry-failed":
+        print(f"🔁 Requeued {queue.retry_failed()} failed jobs")
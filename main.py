@@ -1,15 +1,50 @@
 import os
+import csv
 import json
-from moviepy.config import change_settings
+import time
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Make sure these file names and function names are correct
-from storygenerator import generate_script
-from prototype_video import generate_reel
+from storygenerator import generate_script, generate_scripts, FakeModel
+from instrumentation import metrics, span, summarize_jsonl, prometheus_text
 
 # --- Update this path to match your ImageMagick installation ---
-change_settings({"IMAGEMAGICK_BINARY": r"C:\Program Files\ImageMagick-7.1.2-Q16-HDRI\magick.exe"})
+# (only used when VIDEO_SETTINGS["caption_backend"] is "imagemagick")
+IMAGEMAGICK_BINARY = r"C:\Program Files\ImageMagick-7.1.2-Q16-HDRI\magick.exe"
 
-def main():
+# Fields passed straight through to generate_script()
+ARTISAN_FIELDS = ("artisan_name", "product", "material", "inspiration", "target_audience")
+
+# Images used when a manifest record does not list its own
+DEFAULT_IMAGES = [
+    "pottery_rawmaterial.jpg",
+    "artisants.jpg",
+    "pottery_finalproduct.jpg",
+]
+
+
+def reel_filename(artisan_info):
+    """
+    Builds the output file name for an artisan's reel.
+    """
+    return f"{artisan_info['artisan_name'].replace(' ', '_')}_{artisan_info['product'].replace(' ', '_')}_reel.mp4"
+
+
+def load_renderer():
+    """
+    Imports MoviePy and prototype_video on first use and returns generate_reel.
+    Keeping them out of module load lets `--help`, script-only work and freshly
+    spawned render workers start without paying for the video stack.
+    """
+    from moviepy.config import change_settings
+    change_settings({"IMAGEMAGICK_BINARY": IMAGEMAGICK_BINARY})
+    from prototype_video import generate_reel
+    return generate_reel
+
+
+def main(scene_workers=0, incremental=False, profile="final", streaming=False, memory_budget_mb=None):
     print("🎬 Starting the reel generation process...")
 
     # Define your project details
@@ -41,11 +76,203 @@ def main():
     print("-" * 30)
 
     # Step 2: Build the video from the script and images
-    output_filename = f"{artisan_info['artisan_name'].replace(' ', '_')}_{artisan_info['product'].replace(' ', '_')}_reel.mp4"
-    generate_reel(scenes_data=scenes_data, image_paths=IMAGES, output_filename=output_filename)
+    output_filename = reel_filename(artisan_info)
+    generate_reel = load_renderer()
+    reel_path = generate_reel(scenes_data=scenes_data, image_paths=IMAGES, output_filename=output_filename,
+                              scene_workers=scene_workers, incremental=incremental, profile=profile,
+                              streaming=streaming, memory_budget_mb=memory_budget_mb)
+
+    print(f"✅ Process complete! Video saved as: {reel_path or output_filename}")
+
+
+# -----------------------------------------------------------
+# BATCH MODE
+# -----------------------------------------------------------
+
+def load_manifest(manifest_path):
+    """
+    Reads artisan records from a JSONL or CSV manifest.
+
+    Every record needs the ARTISAN_FIELDS. Optional columns:
+    - images: a list (JSONL) or a ';'-separated string (CSV) of image paths.
+    - output_filename: overrides the generated reel name.
+
+    Two records that resolve to the same output file are rejected, since
+    parallel render workers would overwrite each other's reel.
+    """
+    with open(manifest_path, newline="", encoding="utf-8") as f:
+        if manifest_path.lower().endswith(".csv"):
+            records = list(csv.DictReader(f))
+        else:
+            records = [json.loads(line) for line in f if line.strip()]
+
+    jobs = []
+    outputs = {}
+    for line_no, record in enumerate(records, start=1):
+        missing = [field for field in ARTISAN_FIELDS if not record.get(field)]
+        if missing:
+            raise ValueError(f"Manifest record {line_no} is missing: {', '.join(missing)}")
+
+        images = record.get("images") or DEFAULT_IMAGES
+        if isinstance(images, str):
+            images = [p.strip() for p in images.split(";") if p.strip()]
+
+        artisan_info = {field: record[field] for field in ARTISAN_FIELDS}
+        output_filename = record.get("output_filename") or reel_filename(artisan_info)
+        if output_filename in outputs:
+            raise ValueError(f"Manifest records {outputs[output_filename]} and {line_no} "
+                             f"both write {output_filename}")
+        outputs[output_filename] = line_no
+        jobs.append({
+            "job_id": line_no,
+            "artisan_info": artisan_info,
+            "images": images,
+            "output_filename": output_filename,
+        })
+    return jobs
+
+
+def _render_job(scenes_data, image_paths, output_filename, profile="final", streaming=False,
+                memory_budget_mb=None):
+    """
+    Runs generate_reel() inside a render worker process.
+    Returns the reel path (or None) and the time spent encoding.
+    """
+    generate_reel = load_renderer()
+    started = time.perf_counter()
+    with span("render_job", profile=profile):
+        reel_path = generate_reel(scenes_data=scenes_data, image_paths=image_paths, output_filename=output_filename,
+                                  profile=profile, streaming=streaming, memory_budget_mb=memory_budget_mb)
+    return reel_path, time.perf_counter() - started
+
 
-    print(f"✅ Process complete! Video saved as: {output_filename}")
+def run_batch(manifest_path, script_workers=8, render_workers=None, report_path=None, model=None,
+              profile="final", streaming=False, memory_budget_mb=None):
+    """
+    Generates reels for every record in a manifest.
+
+    Script generation is network-bound and runs as concurrent async Gemini
+    requests; each finished script is handed straight to a process pool that
+    runs the CPU-bound MoviePy encode, so both stages stay busy at the same time.
+    """
+    jobs = load_manifest(manifest_path)
+    render_workers = render_workers or max(1, (os.cpu_count() or 2) // 2)
+    print(f"🎬 Batch of {len(jobs)} reels: {script_workers} concurrent script requests, {render_workers} render workers")
+
+    results = []
+    batch_started = time.perf_counter()
+
+    def record(job, status, **details):
+        result = {
+            "job_id": job["job_id"],
+            "artisan_name": job["artisan_info"]["artisan_name"],
+            "output_filename": job["output_filename"],
+            "status": status,
+            **details,
+        }
+        results.append(result)
+        icon = "✅" if status == "done" else "❌"
+        print(f"{icon} [{len(results)}/{len(jobs)}] {result['artisan_name']}: {status}"
+              + (f" ({result['error']})" if result.get("error") else ""))
+
+    with ProcessPoolExecutor(max_workers=render_workers) as render_pool:
+        render_futures = {}
+
+        def on_script(index, scenes_data, script_seconds):
+            job = jobs[index]
+            job["script_seconds"] = script_seconds
+            if not scenes_data:
+                record(job, "script_failed", error="no valid script", script_seconds=script_seconds)
+                return
+            render_future = render_pool.submit(_render_job, scenes_data, job["images"], job["output_filename"],
+                                               profile, streaming, memory_budget_mb)
+            render_futures[render_future] = job
+
+        asyncio.run(generate_scripts(
+            [job["artisan_info"] for job in jobs],
+            concurrency=script_workers,
+            model=model,
+            on_result=on_script,
+        ))
+
+        for future in as_completed(render_futures):
+            job = render_futures[future]
+            try:
+                reel_path, render_seconds = future.result()
+            except Exception as e:
+                record(job, "render_failed", error=str(e), script_seconds=job["script_seconds"])
+                continue
+            status = "done" if reel_path else "render_failed"
+            record(job, status, reel_path=reel_path,
+                   script_seconds=job["script_seconds"], render_seconds=render_seconds)
+
+    elapsed = time.perf_counter() - batch_started
+    done = sum(1 for r in results if r["status"] == "done")
+    summary = {
+        "total": len(jobs),
+        "done": done,
+        "failed": len(jobs) - done,
+        "elapsed_seconds": round(elapsed, 2),
+        "reels_per_minute": round(done / elapsed * 60, 2) if elapsed else 0.0,
+    }
+
+    print("-" * 30)
+    print(f"📊 {done}/{len(jobs)} reels in {elapsed:.1f}s ({summary['reels_per_minute']} reels/minute)")
+
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "jobs": sorted(results, key=lambda r: r["job_id"])}, f, indent=2)
+        print(f"📝 Batch report written to: {report_path}")
+
+    return summary, results
+
+
+def write_prometheus_metrics(path):
+    """
+    Writes stage latencies and cache counters in Prometheus text format.
+    Uses the JSON-lines sink when one is configured, so spans recorded in
+    render worker processes are included.
+    """
+    summary = summarize_jsonl(metrics.jsonl_path) if metrics.jsonl_path else metrics.summary()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(prometheus_text(summary))
+    print(f"📈 Metrics written to: {path}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate artisan marketing reels.")
+    parser.add_argument("--manifest", help="JSONL or CSV file with one artisan record per line")
+    parser.add_argument("--script-workers", type=int, default=8, help="concurrent Gemini script requests")
+    parser.add_argument("--render-workers", type=int, default=None, help="concurrent MoviePy encodes (default: half the CPUs)")
+    parser.add_argument("--report", help="write per-job status and the throughput summary to this JSON file")
+    parser.add_argument("--scene-workers", type=int, default=0,
+                        help="render the demo reel's scenes as parallel segments with this many processes")
+    parser.add_argument("--incremental", action="store_true",
+                        help="reuse rendered segments of unchanged scenes from earlier runs")
+    parser.add_argument("--streaming", action="store_true",
+                        help="pipe composed frames straight into FFmpeg instead of building a clip tree")
+    parser.add_argument("--preview", action="store_true",
+                        help="render fast low-resolution previews instead of final reels")
+    parser.add_argument("--fake-model", action="store_true", help="use the offline FakeModel instead of Gemini")
+    parser.add_argument("--memory-budget", type=int, default=None, metavar="MB",
+                        help="render each reel scene by scene within this much memory, closing clips eagerly")
+    parser.add_argument("--metrics-jsonl", help="append every timing span and counter to this JSON-lines file")
+    parser.add_argument("--metrics-prom", help="write p50/p90/p99 per stage in Prometheus text format when done")
+    args = parser.parse_args()
+
+    if args.metrics_jsonl:
+        metrics.configure(jsonl_path=args.metrics_jsonl)
+
+    if args.manifest:
+        run_batch(args.manifest, script_workers=args.script_workers,
+                  render_workers=args.render_workers, report_path=args.report,
+                  model=FakeModel() if args.fake_model else None,
+                  profile="preview" if args.preview else "final", streaming=args.streaming,
+                  memory_budget_mb=args.memory_budget)
+    else:
+        main(scene_workers=args.scene_workers, incremental=args.incremental,
+             profile="preview" if args.preview else "final", streaming=args.streaming,
+             memory_budget_mb=args.memory_budget)
+
+    if args.metrics_prom:
+        write_prometheus_metrics(args.metrics_prom)
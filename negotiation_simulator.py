@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Monte-Carlo simulator for the BargainingChatbot pricing policy.
+
+Plays synthetic buyers against the same rules as handle_offer(): accept at
+or above the asking price, reject below min_price, otherwise counter with
+BargainingChatbot.counter_price(). Discounts come from the campaign rules
+in discount_rules.json for the simulated date. Every round is a handful of NumPy
+operations over all still-open sessions, so millions of negotiations take
+seconds:
+
+    python negotiation_simulator.py --sessions 1000000
+    python negotiation_simulator.py --min-price 3000 3500 4000 --date 12-25 --loyal-share 0.2
+
+Buyer model: each buyer has a private reservation price (log-normal around
+RESERVATION_MEAN x ideal_price), opens at a fraction of it, concedes part of
+the remaining gap to min(asking price, reservation) each round, pays the
+asking price as soon as it is within their reservation, and walks away
+after their patience (in rounds) runs out.
+"""
+import json
+import time
+import argparse
+
+import numpy as np
+
+from bargaining_chatbot import BargainingChatbot
+from discount_rules import get_discount_rules, parse_month_day
+
+# Synthetic buyer population, relative to ideal_price
+RESERVATION_MEAN = 0.85
+RESERVATION_SIGMA = 0.15
+OPENING_RANGE = (0.45, 0.85)     # first offer as a fraction of the reservation price
+CONCESSION_RANGE = (0.15, 0.6)   # share of the remaining gap conceded per round
+PATIENCE_RANGE = (3, 10)         # rounds before walking away
+MAX_ROUNDS = 30
+CHUNK_SESSIONS = 1_000_000
+PERCENTILES = (10, 25, 50, 75, 90)
+
+DEAL, ABANDONED = 1, 2
+
+
+def simulate_chunk(rng, sessions, ideal_price, min_price, day, loyal_share, loyalty_points, max_rounds):
+    """
+    Returns (status, rounds, final_price) arrays for one batch of sessions.
+    """
+    reservation = ideal_price * rng.lognormal(np.log(RESERVATION_MEAN), RESERVATION_SIGMA, sessions)
+    offer = reservation * rng.uniform(*OPENING_RANGE, sessions)
+    concession = rng.uniform(*CONCESSION_RANGE, sessions)
+    patience = rng.integers(PATIENCE_RANGE[0], PATIENCE_RANGE[1] + 1, sessions)
+    loyalty_points = np.where(rng.random(sessions) < loyal_share, loyalty_points, 0)
+
+    current = np.full(sessions, float(ideal_price))
+    status = np.zeros(sessions, dtype=np.int8)
+    rounds = np.zeros(sessions, dtype=np.int32)
+    final_price = np.full(sessions, np.nan)
+
+    active = np.arange(sessions)
+    for round_number in range(1, max_rounds + 1):
+        if not len(active):
+            break
+        asking = current[active]
+        # A buyer pays the asking price once it is within their reservation price
+        offered = np.where(asking <= reservation[active], asking, offer[active])
+        rounds[active] = round_number
+
+        accepted = offered >= asking
+        deals = active[accepted]
+        status[deals] = DEAL
+        final_price[deals] = offered[accepted] * get_discount_rules().discount_factors(day, loyalty_points[deals])
+
+        countered = ~accepted & (offered >= min_price)
+        current[active[countered]] = BargainingChatbot.counter_price(offered[countered], asking[countered])
+
+        open_sessions = active[~accepted]
+        target = np.minimum(current[open_sessions], reservation[open_sessions])
+        offer[open_sessions] += concession[open_sessions] * (target - offer[open_sessions])
+        walked_away = rounds[open_sessions] >= patience[open_sessions]
+        status[open_sessions[walked_away]] = ABANDONED
+        active = open_sessions[~walked_away]
+
+    status[active] = ABANDONED  # still haggling after max_rounds
+    return status, rounds, final_price
+
+
+def check_params(sessions, ideal_price, min_price, loyal_share=0.0, max_rounds=MAX_ROUNDS):
+    """
+    Raises ValueError for parameters the simulation can't run with.
+    """
+    if sessions < 0:
+        raise ValueError(f"sessions must be >= 0, got {sessions}")
+    if ideal_price <= 0 or min_price <= 0:
+        raise ValueError(f"prices must be positive, got ideal {ideal_price} and min {min_price}")
+    if min_price > ideal_price:
+        raise ValueError(f"min_price {min_price} is above ideal_price {ideal_price}")
+    if not 0.0 <= loyal_share <= 1.0:
+        raise ValueError(f"loyal_share must be between 0 and 1, got {loyal_share}")
+    if max_rounds < 1:
+        raise ValueError(f"max_rounds must be >= 1, got {max_rounds}")
+
+
+def simulate(sessions, ideal_price, min_price, day=None, loyal_share=0.0, loyalty_points=100, max_rounds=MAX_ROUNDS,
+             seed=None):
+    """
+    Runs `sessions` negotiations on a day of the year (default: today) and returns a summary dict.
+    Zero sessions give an empty summary: zero rates and no means.
+    """
+    check_params(sessions, ideal_price, min_price, loyal_share, max_rounds)
+    day = get_discount_rules().today() if day is None else day
+    rng = np.random.default_rng(seed)
+    results = [
+        simulate_chunk(rng, min(CHUNK_SESSIONS, sessions - start), ideal_price, min_price, day,
+                       loyal_share, loyalty_points, max_rounds)
+        for start in range(0, sessions, CHUNK_SESSIONS)
+    ]
+    status = np.concatenate([result[0] for result in results] or [np.zeros(0, dtype=np.int8)])
+    rounds = np.concatenate([result[1] for result in results] or [np.zeros(0, dtype=np.int32)])
+    final_price = np.concatenate([result[2] for result in results] or [np.zeros(0)])
+
+    deals = status == DEAL
+    prices = final_price[deals]
+    deal_rounds = rounds[deals]
+    summary = {
+        "sessions": sessions,
+        "ideal_price": ideal_price,
+        "min_price": min_price,
+        "deal_rate": float(deals.mean()) if sessions else 0.0,
+        "abandonment_rate": float((status == ABANDONED).mean()) if sessions else 0.0,
+        "revenue_per_session": float(prices.sum() / sessions) if sessions else 0.0,
+        "final_price": {"mean": float(prices.mean()) if len(prices) else None},
+        "rounds_to_deal": {"mean": float(deal_rounds.mean()) if len(deal_rounds) else None},
+        "abandoned_after_rounds": {"mean": float(rounds[status == ABANDONED].mean()) if (status == ABANDONED).any()
+                                   else None},
+        "rounds_histogram": np.bincount(deal_rounds, minlength=max_rounds + 1)[1:].tolist(),
+    }
+    if len(prices):
+        for p, price, rounds_p in zip(PERCENTILES, np.percentile(prices, PERCENTILES),
+                                      np.percentile(deal_rounds, PERCENTILES)):
+            summary["final_price"][f"p{p}"] = round(float(price), 2)
+            summary["rounds_to_deal"][f"p{p}"] = float(rounds_p)
+    return summary
+
+
+def print_summary(summary, seconds):
+    print(f"🤝 ideal ₹{summary['ideal_price']:.0f}, min ₹{summary['min_price']:.0f}: "
+          f"{summary['sessions']:,} sessions in {seconds:.2f}s")
+    print(f"   deals {summary['deal_rate']:.1%}, abandoned {summary['abandonment_rate']:.1%}, "
+          f"revenue/session ₹{summary['revenue_per_session']:.0f}")
+    price, rounds = summary["final_price"], summary["rounds_to_deal"]
+    if price["mean"] is not None:
+        print("   final price  " + "  ".join(f"p{p} ₹{price[f'p{p}']:.0f}" for p in PERCENTILES)
+              + f"  mean ₹{price['mean']:.0f}")
+        print("   rounds       " + "  ".join(f"p{p} {rounds[f'p{p}']:.0f}" for p in PERCENTILES)
+              + f"  mean {rounds['mean']:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate many buyers against the bargaining policy.")
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--ideal-price", type=float, default=5000.0)
+    parser.add_argument("--min-price", type=float, nargs="+", default=[3500.0],
+                        help="one or more minimum prices to compare")
+    parser.add_argument("--date", help="MM-DD the negotiations happen on, for date-bound discounts (default: today)")
+    parser.add_argument("--loyal-share", type=float, default=0.0, help="fraction of buyers with loyalty points")
+    parser.add_argument("--loyalty-points", type=float, default=100, help="points held by those buyers")
+    parser.add_argument("--max-rounds", type=int, default=MAX_ROUNDS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the summaries as JSON")
+    args = parser.parse_args()
+
+    for min_price in args.min_price:
+        try:
+            check_params(args.sessions, args.ideal_price, min_price, args.loyal_share, args.max_rounds)
+        except ValueError as e:
+            parser.error(str(e))
+
+    day = parse_month_day(args.date) if args.date else None
+    summaries = []
+    for min_price in args.min_price:
+        started = time.perf_counter()
+        summary = simulate(args.sessions, args.ideal_price, min_price, day, args.loyal_share,
+                           args.loyalty_points, args.max_rounds, args.seed)
+        summaries.append(summary)
+        if not args.json:
+            print_summary(summary, time.perf_counter() - started)
+    if args.json:
+        print(json.dumps(summaries, indent=2))
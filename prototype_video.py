@@ -1,7 +1,11 @@
 # create_video.py
 import os
+import gc
 import json
-import pyttsx3
+import hashlib
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 from moviepy.editor import (
     ImageClip,
     AudioFileClip,
@@ -11,9 +15,15 @@ from moviepy.editor import (
     TextClip,
     CompositeVideoClip,
 )
-from moviepy.config import change_settings
+from moviepy.config import change_settings, get_setting
 import moviepy.audio.fx.all as afx
 
+from voiceover_service import VoiceoverService, get_voiceover_service
+from image_cache import get_image_cache, resized_size
+from caption_renderer import get_caption_renderer
+from instrumentation import span, count, current_rss
+from disk_cache import evict_files, touch
+
 
 # -----------------------------------------------------------
 # SETTINGS
@@ -27,6 +37,11 @@ OUTPUT_DIR = "reels"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 VOICEOVER_DIR = "voiceovers"
 os.makedirs(VOICEOVER_DIR, exist_ok=True)
+SEGMENT_DIR = "segments"
+os.makedirs(SEGMENT_DIR, exist_ok=True)
+SEGMENT_CACHE_MAX_MB = 2048
+SEGMENT_CACHE_TTL = 7 * 24 * 60 * 60  # seconds since a segment was last used
+SEGMENT_CACHE_GRACE = 60 * 60  # segments used this recently may still be joined by another render
 
 VIDEO_SETTINGS = {
     "fps": 24,
@@ -37,6 +52,36 @@ VIDEO_SETTINGS = {
     "text_stroke_color": "black",
     "text_stroke_width": 2,
     "text_fontsize": 50,
+    "caption_backend": "pil",  # "pil" (in-process, cached) or "imagemagick" (TextClip)
+    "height": 1080,
+    "preset": "medium",
+    "music_path": "background.mp3",
+    "music_volume": 0.2,
+}
+
+# Cheap "does this look right" renders. Same scene pipeline and layout as the
+# final reel, with captions scaled to the lower resolution so every frame
+# matches the final output, just smaller.
+PREVIEW_HEIGHT = 360
+PREVIEW_SETTINGS = {
+    **VIDEO_SETTINGS,
+    "fps": 8,
+    "height": PREVIEW_HEIGHT,
+    "preset": "ultrafast",
+    "text_fontsize": round(VIDEO_SETTINGS["text_fontsize"] * PREVIEW_HEIGHT / VIDEO_SETTINGS["height"]),
+    "text_stroke_width": max(1, round(VIDEO_SETTINGS["text_stroke_width"] * PREVIEW_HEIGHT / VIDEO_SETTINGS["height"])),
+    "music_path": None,
+}
+
+RENDER_PROFILES = {
+    "final": VIDEO_SETTINGS,
+    "preview": PREVIEW_SETTINGS,
+}
+
+# Used to size the scene window when a per-job memory budget is set
+MEMORY_SETTINGS = {
+    "worker_overhead_mb": 150,  # interpreter + MoviePy + FFmpeg pipe per render process
+    "frame_copies": 4,          # background, caption, composite and encoder buffers per scene
 }
 
 
@@ -47,31 +92,56 @@ VIDEO_SETTINGS = {
 def tts_to_file(text: str, filename: str):
     """
     Generates speech audio from text and saves it to a file using pyttsx3.
+    Reuses the process-wide TTS engine instead of initializing a new one.
     """
-    engine = pyttsx3.init()
+    engine = get_voiceover_service().get_engine()
     engine.save_to_file(text, filename)
     engine.runAndWait()
 
 
-def create_scene_clip(image_path: str, voice_text: str, caption_text: str, scene_id: int):
+def create_caption_clip(caption_text: str, settings: dict = VIDEO_SETTINGS):
+    """
+    Rasterizes a caption with the backend chosen in settings["caption_backend"].
+    """
+    if settings["caption_backend"] == "imagemagick":
+        with span("caption_rasterize", backend="imagemagick"):
+            return TextClip(
+                caption_text,
+                fontsize=settings["text_fontsize"],
+                color=settings["text_color"],
+                font=settings["font_path"],
+                stroke_color=settings["text_stroke_color"],
+                stroke_width=settings["text_stroke_width"],
+            )
+
+    rgb, mask = get_caption_renderer().render(
+        caption_text,
+        font=settings["font_path"],
+        fontsize=settings["text_fontsize"],
+        color=settings["text_color"],
+        stroke_color=settings["text_stroke_color"],
+        stroke_width=settings["text_stroke_width"],
+    )
+    return ImageClip(rgb).set_mask(ImageClip(mask, ismask=True))
+
+
+def create_scene_clip(image_path: str, voice_text: str, caption_text: str, scene_id: int,
+                      settings: dict = VIDEO_SETTINGS, voice_path: str = None):
     """
     Creates a single video clip for a scene with image, voiceover, and captions.
+    voice_path is an already synthesized voiceover for voice_text, if any.
     """
-    voice_path = os.path.join(VOICEOVER_DIR, f"scene_{scene_id}.mp3")
-    tts_to_file(voice_text, voice_path)
+    if voice_path is None:
+        # Cached by content, so unchanged voiceovers are not synthesized again
+        voice_path, _ = get_voiceover_service().synthesize(voice_text)
 
     voice_clip = AudioFileClip(voice_path)
-    img_clip = ImageClip(image_path).set_duration(voice_clip.duration).resize(height=1080)
+    # Decoded and resized once, then shared by every scene that uses this image
+    frame = get_image_cache().get_frame(image_path, settings["height"])
+    img_clip = ImageClip(frame).set_duration(voice_clip.duration)
     
     txt_clip = (
-        TextClip(
-            caption_text,
-            fontsize=VIDEO_SETTINGS["text_fontsize"],
-            color=VIDEO_SETTINGS["text_color"],
-            font=VIDEO_SETTINGS["font_path"],
-            stroke_color=VIDEO_SETTINGS["text_stroke_color"],
-            stroke_width=VIDEO_SETTINGS["text_stroke_width"],
-        )
+        create_caption_clip(caption_text, settings)
         .set_duration(voice_clip.duration)
         .set_position(("center", 0.8), relative=True)
     )
@@ -81,10 +151,48 @@ def create_scene_clip(image_path: str, voice_text: str, caption_text: str, scene
     return video_clip, voice_clip
 
 
-def generate_reel(scenes_data: list, image_paths: list, output_filename: str):
+def profile_output_filename(output_filename: str, profile: str = "final"):
+    """
+    Output name for a render profile: "final" keeps the name, other profiles
+    get a suffix (reel.mp4 -> reel_preview.mp4) so they never overwrite it.
+    """
+    if profile == "final":
+        return output_filename
+    stem, ext = os.path.splitext(output_filename)
+    return f"{stem}_{profile}{ext}"
+
+
+def generate_reel(scenes_data: list, image_paths: list, output_filename: str, scene_workers: int = 0,
+                  incremental: bool = False, profile: str = "final", streaming: bool = False,
+                  memory_budget_mb: int = None):
     """
     Main function to orchestrate the video generation.
+    Returns the path of the exported reel, or None if nothing was written.
+
+    profile selects the RENDER_PROFILES entry; "preview" renders a low
+    resolution, low frame rate copy (saved as *_preview.mp4) without music.
+
+    With scene_workers > 0 every scene is rendered to its own segment in a
+    pool of worker processes and the segments are joined without re-encoding.
+    With incremental=True segments whose inputs have not changed are reused
+    from earlier renders, so only edited scenes are encoded again.
+    With streaming=True each scene is composed once and its frames are piped
+    straight into a single FFmpeg process (takes precedence over the above).
+    With memory_budget_mb set, scenes are rendered as segments in a window
+    sized to the budget and every clip is closed as soon as it is encoded,
+    instead of keeping the whole clip tree open until the final export.
     """
+    settings = RENDER_PROFILES[profile]
+    output_filename = profile_output_filename(output_filename, profile)
+
+    if streaming:
+        return generate_reel_streaming(scenes_data, image_paths, output_filename, settings=settings)
+
+    if scene_workers or incremental or memory_budget_mb:
+        return generate_reel_segmented(scenes_data, image_paths, output_filename,
+                                       workers=scene_workers, incremental=incremental, settings=settings,
+                                       memory_budget_mb=memory_budget_mb)
+
     if not isinstance(scenes_data, list) or not scenes_data:
         print("❌ Invalid or empty scenes data.")
         return
@@ -103,7 +211,8 @@ def generate_reel(scenes_data: list, image_paths: list, output_filename: str):
             image_path=img_path,
             voice_text=scene.get("voiceover", ""),
             caption_text=scene.get("text", ""),
-            scene_id=i
+            scene_id=i,
+            settings=settings,
         )
         
         clips.append(video_clip)
@@ -117,26 +226,449 @@ def generate_reel(scenes_data: list, image_paths: list, output_filename: str):
     
     final_audio = concatenate_audioclips(audio_clips)
     
-    music_path = "background.mp3"
-    if os.path.exists(music_path):
-        music_clip = AudioFileClip(music_path).fx(afx.volumex, 0.2)
+    music_path = settings["music_path"]
+    if music_path and os.path.exists(music_path):
+        music_clip = AudioFileClip(music_path).fx(afx.volumex, settings["music_volume"])
         music_clip = music_clip.set_duration(final_video.duration)
         final_audio = CompositeAudioClip([final_audio, music_clip])
 
     final_video = final_video.set_audio(final_audio)
 
     final_video_path = os.path.join(OUTPUT_DIR, output_filename)
+    # One temporary audio file per export, so parallel batch renders never mix each other's audio
+    temp_audio_path = f"{final_video_path}.{os.getpid()}.m4a"
     try:
-        final_video.write_videofile(
-            final_video_path,
-            fps=VIDEO_SETTINGS["fps"],
-            codec=VIDEO_SETTINGS["codec"],
-            audio_codec=VIDEO_SETTINGS["audio_codec"],
-            temp_audiofile=os.path.join(VOICEOVER_DIR, "temp_audio.m4a"),
+        with span("export", mode="clips"):
+            final_video.write_videofile(
+                final_video_path,
+                fps=settings["fps"],
+                codec=settings["codec"],
+                audio_codec=settings["audio_codec"],
+                preset=settings["preset"],
+                temp_audiofile=temp_audio_path,
+            )
+        print(f"✅ Reel successfully generated at: {final_video_path}")
+        return final_video_path
+    except Exception as e:
+        print(f"❌ Error during video export: {e}")
+    finally:
+        # Release FFmpeg readers and file handles held by every scene
+        final_video.close()
+        for clip in clips + audio_clips:
+            clip.close()
+        if os.path.exists(temp_audio_path):
+            os.remove(temp_audio_path)
+
+
+# -----------------------------------------------------------
+# SEGMENT RENDERING (PARALLEL / INCREMENTAL)
+# -----------------------------------------------------------
+
+_file_hashes = {}
+
+
+def file_hash(path: str):
+    """
+    Returns the SHA-256 of a file's contents, memoized per (path, size, mtime).
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _file_hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _file_hashes[memo_key] = digest.hexdigest()
+    return _file_hashes[memo_key]
+
+
+def scene_fingerprint(image_path: str, voice_text: str, caption_text: str, canvas_size: tuple,
+                      settings: dict = VIDEO_SETTINGS):
+    """
+    Hashes every input that affects a rendered segment: the image contents,
+    the voiceover text and voice, the caption, the canvas and the render settings.
+    """
+    voiceover = get_voiceover_service()
+    payload = json.dumps({
+        "image": file_hash(image_path),
+        "voiceover": VoiceoverService.cache_key(voice_text, voiceover.voice, voiceover.rate),
+        "caption": caption_text,
+        "canvas": list(canvas_size),
+        "settings": settings,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def scene_canvas_size(image_paths: list, settings: dict = VIDEO_SETTINGS):
+    """
+    Returns the (width, height) every segment is rendered at.
+
+    Stream-copy concatenation needs identical dimensions in every segment, so
+    scenes are centered on the largest resized image (like method="compose"),
+    rounded up to even numbers for yuv420p.
+    """
+    height = settings["height"]
+    width = max(resized_size(path, height)[0] for path in image_paths)
+    return width + width % 2, height + height % 2
+
+
+def render_scene_segment(image_path: str, voice_text: str, caption_text: str, scene_id: int,
+                         segment_path: str, canvas_size: tuple, settings: dict = VIDEO_SETTINGS,
+                         voice_path: str = None):
+    """
+    Renders one scene, with its voiceover, to a standalone MP4 segment.
+    Runs inside a worker process.
+    """
+    video_clip, voice_clip = create_scene_clip(image_path, voice_text, caption_text, scene_id, settings,
+                                               voice_path=voice_path)
+    segment = (
+        CompositeVideoClip([video_clip.set_position("center")], size=canvas_size)
+        .set_duration(voice_clip.duration)
+        .set_audio(voice_clip)
+    )
+    # Write under a temporary name so an interrupted render never leaves a
+    # half-written segment that a later incremental build would reuse
+    tmp_path = f"{segment_path}.{os.getpid()}.tmp.mp4"
+    try:
+        with span("export", mode="segment"):
+            segment.write_videofile(
+                tmp_path,
+                fps=settings["fps"],
+                codec=settings["codec"],
+                audio_codec=settings["audio_codec"],
+                preset=settings["preset"],
+                temp_audiofile=f"{tmp_path}.m4a",
+                logger=None,
+            )
+        os.replace(tmp_path, segment_path)
+    finally:
+        segment.close()
+        video_clip.close()
+        voice_clip.close()
+    return segment_path
+
+
+def concat_segments(segment_paths: list, output_path: str, music_path: str = None, music_volume: float = 0.2,
+                    audio_codec: str = "aac"):
+    """
+    Joins rendered segments with FFmpeg's concat demuxer.
+
+    Video is always stream-copied. Audio is copied as well, unless background
+    music has to be mixed in, in which case only the audio track is re-encoded.
+    """
+    list_path = f"{output_path}.segments.txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in segment_paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+
+    cmd = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_path]
+    if music_path and os.path.exists(music_path):
+        cmd += [
+            "-stream_loop", "-1", "-i", music_path,
+            "-filter_complex",
+            f"[1:a]volume={music_volume}[music];"
+            "[0:a][music]amix=inputs=2:duration=first:dropout_transition=0[mix]",
+            "-map", "0:v", "-map", "[mix]", "-c:v", "copy", "-c:a", audio_codec,
+        ]
+    else:
+        cmd += ["-c", "copy"]
+    cmd.append(output_path)
+
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
+    finally:
+        os.remove(list_path)
+    return output_path
+
+
+def evict_segments(keep=(), max_mb=SEGMENT_CACHE_MAX_MB, ttl=SEGMENT_CACHE_TTL, grace=SEGMENT_CACHE_GRACE):
+    """
+    Deletes segments unused for longer than `ttl`, then the least recently
+    used ones until SEGMENT_DIR fits in `max_mb`. Segments in `keep` and
+    anything used within `grace` seconds are never deleted, and temporary
+    files left behind by interrupted renders are removed after `grace`.
+    """
+    evict_files(SEGMENT_DIR, max_mb, ttl, grace=grace, keep=keep, counter="segment_evicted")
+
+
+def estimate_scene_memory_mb(canvas_size: tuple, settings: dict = VIDEO_SETTINGS):
+    """
+    Rough peak memory of rendering one scene in its own process.
+    """
+    width, height = canvas_size
+    frame_mb = width * height * 3 / 2 ** 20
+    return MEMORY_SETTINGS["worker_overhead_mb"] + frame_mb * MEMORY_SETTINGS["frame_copies"]
+
+
+def enforce_memory_budget(memory_budget_mb: int):
+    """
+    Drops this process's in-memory frame and caption caches (the on-disk
+    copies stay) when its RSS is over budget. Returns True if still over.
+    """
+    rss = current_rss()
+    if rss is None or rss / 2 ** 20 <= memory_budget_mb:
+        return False
+    get_image_cache().clear()
+    get_caption_renderer().clear()
+    gc.collect()
+    count("memory_budget_trim")
+    rss = current_rss()
+    return rss / 2 ** 20 > memory_budget_mb
+
+
+def _render_scene_segment_budgeted(worker_budget_mb: float, *args):
+    """
+    render_scene_segment() for pool workers: each worker checks its share of
+    the memory budget after every scene, like the sequential path does.
+    """
+    segment_path = render_scene_segment(*args)
+    if enforce_memory_budget(worker_budget_mb):
+        print(f"⚠️ Render worker still above its {worker_budget_mb:.0f} MB share of the budget after releasing caches")
+    return segment_path
+
+
+def _render_pool(workers: int, recycle: bool):
+    if recycle:
+        try:
+            # A fresh process per scene hands all of its memory back to the OS (Python 3.11+)
+            return ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1)
+        except TypeError:
+            pass
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def render_segments(scenes_data: list, image_paths: list, workers: int = 0, incremental: bool = False,
+                    settings: dict = VIDEO_SETTINGS, memory_budget_mb: int = None, voiceover_paths: list = None):
+    """
+    Renders every scene to its own segment and returns the segment paths in
+    scene order, or None on failure.
+
+    Segments are stored under a fingerprint of their inputs. With
+    incremental=True only scenes without a matching segment are rendered;
+    with workers > 1 those are rendered in parallel worker processes.
+    With memory_budget_mb set, the number of scenes in flight is capped to
+    what fits in the budget and caches are trimmed whenever it is exceeded
+    (in parallel renders every worker checks an equal share of the budget).
+    Old segments from earlier renders are evicted with evict_segments().
+    voiceover_paths optionally lists an already synthesized voiceover per
+    scene (None entries are synthesized as usual).
+    """
+    if not isinstance(scenes_data, list) or not scenes_data:
+        print("❌ Invalid or empty scenes data.")
+        return
+
+    scenes = []
+    for i, scene in enumerate(scenes_data):
+        img_path = image_paths[i % len(image_paths)]
+        if not os.path.exists(img_path):
+            print(f"❌ Image not found for scene {i}: {img_path}")
+            continue
+        scenes.append((i, img_path, scene.get("voiceover", ""), scene.get("text", "")))
+
+    if not scenes:
+        print("❌ No video clips were created.")
+        return
+
+    canvas_size = scene_canvas_size([img_path for _, img_path, _, _ in scenes], settings)
+
+    segment_paths = []
+    dirty = []
+    for i, img_path, voice_text, caption_text in scenes:
+        voice_path = voiceover_paths[i] if voiceover_paths and i < len(voiceover_paths) else None
+        fingerprint = scene_fingerprint(img_path, voice_text, caption_text, canvas_size, settings)
+        segment_path = os.path.join(SEGMENT_DIR, f"{fingerprint}.mp4")
+        if segment_path in segment_paths:
+            segment_paths.append(segment_path)  # identical scene, render it once
+            continue
+        segment_paths.append(segment_path)
+        if incremental and os.path.exists(segment_path):
+            touch(segment_path)  # mark as recently used for LRU eviction
+        else:
+            dirty.append((img_path, voice_text, caption_text, i, segment_path, canvas_size, settings, voice_path))
+
+    if incremental:
+        print(f"♻️ Reusing {len(scenes) - len(dirty)} of {len(scenes)} scene segments")
+
+    if memory_budget_mb:
+        window = max(1, int(memory_budget_mb // estimate_scene_memory_mb(canvas_size, settings)))
+        if (workers or 1) > window:
+            print(f"🧮 Memory budget of {memory_budget_mb} MB allows {window} scene(s) in flight")
+        workers = min(workers or 1, window)
+
+    try:
+        if workers and workers > 1 and len(dirty) > 1:
+            with _render_pool(workers, recycle=bool(memory_budget_mb)) as pool:
+                if memory_budget_mb:
+                    futures = [pool.submit(_render_scene_segment_budgeted, memory_budget_mb / workers, *args)
+                               for args in dirty]
+                else:
+                    futures = [pool.submit(render_scene_segment, *args) for args in dirty]
+                for future in futures:
+                    future.result()
+        else:
+            for args in dirty:
+                render_scene_segment(*args)
+                if memory_budget_mb and enforce_memory_budget(memory_budget_mb):
+                    print(f"⚠️ Still above the {memory_budget_mb} MB budget after releasing caches")
+    except Exception as e:
+        print(f"❌ Error while rendering scene segments: {e}")
+        return
+
+    evict_segments(keep=segment_paths)
+    return segment_paths
+
+
+def generate_reel_segmented(scenes_data: list, image_paths: list, output_filename: str, workers: int = 0,
+                            incremental: bool = False, settings: dict = VIDEO_SETTINGS,
+                            memory_budget_mb: int = None):
+    """
+    Renders every scene to its own segment with render_segments(), then
+    joins the segments with a stream-copy concat.
+    """
+    segment_paths = render_segments(scenes_data, image_paths, workers=workers, incremental=incremental,
+                                    settings=settings, memory_budget_mb=memory_budget_mb)
+    if not segment_paths:
+        return
+
+    final_video_path = os.path.join(OUTPUT_DIR, output_filename)
+    try:
+        with span("export", mode="concat"):
+            concat_segments(segment_paths, final_video_path,
+                            music_path=settings["music_path"], music_volume=settings["music_volume"],
+                            audio_codec=settings["audio_codec"])
+        print(f"✅ Reel successfully generated at: {final_video_path}")
+        return final_video_path
+    except Exception as e:
+        print(f"❌ Error during video export: {e}")
+
+
+# -----------------------------------------------------------
+# STREAMING EXPORT
+# -----------------------------------------------------------
+
+def compose_scene_frame(image_path: str, caption_text: str, canvas_size: tuple, settings: dict = VIDEO_SETTINGS):
+    """
+    Composes a scene's single still frame with NumPy: the background centered
+    on the canvas and the caption alpha-blended at the same position
+    create_scene_clip() uses. Returns an HxWx3 uint8 array.
+    """
+    canvas_w, canvas_h = canvas_size
+    frame = np.zeros((canvas_h, canvas_w, 3), dtype=np.uint8)
+
+    background = get_image_cache().get_frame(image_path, settings["height"])
+    bg_h, bg_w = background.shape[:2]
+    bg_x, bg_y = (canvas_w - bg_w) // 2, (canvas_h - bg_h) // 2
+    frame[bg_y:bg_y + bg_h, bg_x:bg_x + bg_w] = background
+
+    if caption_text:
+        rgb, mask = get_caption_renderer().render(
+            caption_text,
+            font=settings["font_path"],
+            fontsize=settings["text_fontsize"],
+            color=settings["text_color"],
+            stroke_color=settings["text_stroke_color"],
+            stroke_width=settings["text_stroke_width"],
         )
+        # ("center", 0.8) relative to the scene, as in create_scene_clip()
+        x = bg_x + (bg_w - rgb.shape[1]) // 2
+        y = bg_y + int(0.8 * bg_h)
+
+        # Clip the caption to the canvas
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + rgb.shape[1], canvas_w), min(y + rgb.shape[0], canvas_h)
+        if x0 < x1 and y0 < y1:
+            cap_rgb = rgb[y0 - y:y1 - y, x0 - x:x1 - x]
+            alpha = mask[y0 - y:y1 - y, x0 - x:x1 - x, None]
+            region = frame[y0:y1, x0:x1]
+            frame[y0:y1, x0:x1] = (alpha * cap_rgb + (1 - alpha) * region).astype(np.uint8)
+
+    return frame
+
+
+def generate_reel_streaming(scenes_data: list, image_paths: list, output_filename: str,
+                            settings: dict = VIDEO_SETTINGS):
+    """
+    Exports a reel by piping raw frames into one FFmpeg process.
+
+    Scenes are still images with a caption overlay, so each scene is composed
+    exactly once and its bytes are written for every frame it is on screen.
+    The voiceovers (and background music) are muxed in the same FFmpeg pass,
+    so there is no clip tree and no temporary audio file.
+    """
+    if not isinstance(scenes_data, list) or not scenes_data:
+        print("❌ Invalid or empty scenes data.")
+        return
+
+    scenes = []
+    for i, scene in enumerate(scenes_data):
+        img_path = image_paths[i % len(image_paths)]
+        if not os.path.exists(img_path):
+            print(f"❌ Image not found for scene {i}: {img_path}")
+            continue
+        voice_path, duration = get_voiceover_service().synthesize(scene.get("voiceover", ""))
+        scenes.append((img_path, scene.get("text", ""), voice_path, duration))
+
+    if not scenes:
+        print("❌ No video clips were created.")
+        return
+
+    canvas_w, canvas_h = scene_canvas_size([img_path for img_path, _, _, _ in scenes], settings)
+    fps = settings["fps"]
+    final_video_path = os.path.join(OUTPUT_DIR, output_filename)
+
+    voice_list_path = f"{final_video_path}.voiceovers.txt"
+    with open(voice_list_path, "w", encoding="utf-8") as f:
+        for _, _, voice_path, _ in scenes:
+            f.write(f"file '{os.path.abspath(voice_path)}'\n")
+
+    cmd = [
+        get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{canvas_w}x{canvas_h}", "-r", str(fps), "-i", "-",
+        "-f", "concat", "-safe", "0", "-i", voice_list_path,
+    ]
+    music_path = settings["music_path"]
+    if music_path and os.path.exists(music_path):
+        cmd += [
+            "-stream_loop", "-1", "-i", music_path,
+            "-filter_complex",
+            f"[2:a]volume={settings['music_volume']}[music];"
+            "[1:a][music]amix=inputs=2:duration=first:dropout_transition=0[mix]",
+            "-map", "0:v", "-map", "[mix]",
+        ]
+    else:
+        cmd += ["-map", "0:v", "-map", "1:a"]
+    cmd += [
+        "-c:v", settings["codec"], "-preset", settings["preset"], "-pix_fmt", "yuv420p",
+        "-c:a", settings["audio_codec"], final_video_path,
+    ]
+
+    try:
+        with span("export", mode="streaming"):
+            proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+            try:
+                # Frame counts come from the running total so rounding never drifts
+                # the video away from the voiceovers
+                elapsed, frames_written = 0.0, 0
+                for img_path, caption_text, _, duration in scenes:
+                    frame_bytes = compose_scene_frame(img_path, caption_text, (canvas_w, canvas_h), settings).tobytes()
+                    elapsed += duration
+                    frame_count = round(elapsed * fps) - frames_written
+                    for _ in range(frame_count):
+                        proc.stdin.write(frame_bytes)
+                    frames_written += frame_count
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass  # FFmpeg exited early; its error is reported below
+            stderr = proc.stderr.read().decode(errors="replace")
+            returncode = proc.wait()
+        if returncode != 0:
+            raise RuntimeError(f"FFmpeg failed: {stderr.strip()}")
         print(f"✅ Reel successfully generated at: {final_video_path}")
+        return final_video_path
     except Exception as e:
         print(f"❌ Error during video export: {e}")
+    finally:
+        os.remove(voice_list_path)
 
 
 # -----------------------------------------------------------
@@ -6,20 +6,14 @@ L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
     attribution: '© OpenStreetMap contributors'
 }).addTo(mymap);
 
-// Data structure to store artisan traditions for each state
-// NOTE: The state names here MUST exactly match the names in your GeoJSON file.
-const artisanData = {
-    "Rajasthan": "Tie-Dye (Bandhani), Block Printing, Blue Pottery",
-    "Gujarat": "Patola Silk, Kutch Embroidery, Rogan Art",
-    "Kerala": "Kathakali Masks, Aranmula Kannadi, Coir Products",
-    "Goa": "Terracotta and Clay Work, Coir Craft, Wood Carving",
-    "Bihar": "Madhubani Painting, Sujini Embroidery, Stonecraft",
-    "West Bengal": "Kantha Embroidery, Terracotta, Dokra Art",
-    "Odisha": "Pattachitra Paintings, Appliqué Work, Silver Filigree",
-    "Uttar Pradesh": "Chikankari Embroidery, Pottery, Metalware",
-    "Jammu and Kashmir": "Pashmina Shawls, Walnut Wood Carving, Paper Mache"
-    // Add more states and their traditions here
-};
+// Artisan traditions for each state, served from crafts.json by serve_frontend.py
+// NOTE: The state names in crafts.json MUST exactly match the names in geodata/ (see build_geodata.py).
+let artisanData = {};
+fetch('api/crafts')
+    .then(response => response.json())
+    .then(data => {
+        artisanData = data;
+    });
 
 // Function to style the GeoJSON states
 function style(feature) {
@@ -68,13 +62,54 @@ function onEachFeature(feature, layer) {
     });
 }
 
-// Load the GeoJSON file
+// Load state boundaries: geodata/manifest.json lists one simplified TopoJSON
+// file per zoom band (built by build_geodata.py); only the band for the
+// current zoom is fetched, and each band is fetched at most once
 let geojson;
-fetch('india_states.geojson')
-    .then(response => response.json())
-    .then(data => {
+let geoManifest;
+let activeLevel;
+const topologyCache = {};
+
+function levelForZoom(zoom) {
+    return geoManifest.levels.find(level => zoom >= level.min_zoom && zoom <= level.max_zoom)
+        || geoManifest.levels[geoManifest.levels.length - 1];
+}
+
+function loadLevel(level) {
+    if (!topologyCache[level.file]) {
+        topologyCache[level.file] = fetch('geodata/' + level.file)
+            .then(response => response.json())
+            .then(topology => topojson.feature(topology, topology.objects[geoManifest.object]));
+    }
+    return topologyCache[level.file];
+}
+
+function showLevelForZoom() {
+    const level = levelForZoom(mymap.getZoom());
+    if (level === activeLevel) {
+        return;
+    }
+    activeLevel = level;
+    loadLevel(level).then(data => {
+        // Ignore responses that arrive after the user zoomed to another band
+        if (level !== activeLevel) {
+            return;
+        }
+        const previous = geojson;
         geojson = L.geoJson(data, {
             style: style,
             onEachFeature: onEachFeature
         }).addTo(mymap);
-    });
\ No newline at end of file
+        if (previous) {
+            mymap.removeLayer(previous);
+        }
+    });
+}
+
+fetch('geodata/manifest.json')
+    .then(response => response.json())
+    .then(manifest => {
+        geoManifest = manifest;
+        showLevelForZoom();
+        mymap.on('zoomend', showLevelForZoom);
+    });
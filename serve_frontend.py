@@ -0,0 +1,319 @@
+# serve_frontend.py
+"""
+Build step and local server for the artisan map frontend.
+
+    python serve_frontend.py build              # -> dist/
+    python serve_frontend.py serve --port 8000  # builds, then serves dist/ and /api/crafts
+
+The build copies index.html, script.js, style.css and geodata/ into dist/.
+Every asset except index.html gets a content hash in its name, and the
+references to it are rewritten (index.html -> script/style, script.js ->
+geodata manifest, manifest -> TopoJSON levels). Each file also gets a
+precompressed .gz variant, plus .br when the `brotli` module is installed.
+
+The server answers with the best precompressed variant the client accepts.
+It sends strong ETags and honours If-None-Match with 304. Hashed names are
+cached as immutable for a year; index.html and the API are revalidated.
+Single byte-range requests are supported. /api/crafts serves crafts.json.
+"""
+import os
+import re
+import gzip
+import json
+import shutil
+import hashlib
+import argparse
+import mimetypes
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DIST_DIR = "dist"
+CRAFTS_PATH = "crafts.json"
+GEODATA_DIR = "geodata"
+HASH_LENGTH = 10
+MIN_COMPRESS_BYTES = 512
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+HASHED_NAME = re.compile(r"\.[0-9a-f]{%d}\.[^./]+$" % HASH_LENGTH)
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))  # in order of preference
+
+mimetypes.add_type("application/json", ".json")
+mimetypes.add_type("text/javascript", ".js")
+
+
+# -----------------------------------------------------------
+# BUILD
+# -----------------------------------------------------------
+
+def hashed_name(name, data):
+    root, ext = os.path.splitext(name)
+    return f"{root}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def write_asset(dist_dir, relative_path, data):
+    """
+    Writes a file and its compressed variants (kept only when smaller).
+    """
+    path = os.path.join(dist_dir, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    if len(data) < MIN_COMPRESS_BYTES:
+        return
+    # mtime=0 keeps the .gz bytes (and so its ETag) identical across builds
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(data):
+            with open(path + suffix, "wb") as f:
+                f.write(compressed)
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def build(dist_dir=DIST_DIR):
+    """
+    Writes the content-hashed frontend to dist_dir and returns {source: built name}.
+    """
+    if os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+    names = {}
+
+    # TopoJSON levels, then the manifest that points at them
+    with open(os.path.join(GEODATA_DIR, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    for level in manifest["levels"]:
+        data = read_bytes(os.path.join(GEODATA_DIR, level["file"]))
+        built = hashed_name(level["file"], data)
+        write_asset(dist_dir, os.path.join(GEODATA_DIR, built), data)
+        names[f"{GEODATA_DIR}/{level['file']}"] = f"{GEODATA_DIR}/{built}"
+        level["file"] = built
+    data = json.dumps(manifest, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    names[f"{GEODATA_DIR}/manifest.json"] = f"{GEODATA_DIR}/{hashed_name('manifest.json', data)}"
+    write_asset(dist_dir, names[f"{GEODATA_DIR}/manifest.json"], data)
+
+    # Scripts and styles, with their references rewritten first so the hash covers them
+    script = read_bytes("script.js").decode("utf-8")
+    script = script.replace(f"'{GEODATA_DIR}/manifest.json'", f"'{names[f'{GEODATA_DIR}/manifest.json']}'")
+    for source, data in (("script.js", script.encode("utf-8")), ("style.css", read_bytes("style.css"))):
+        names[source] = hashed_name(source, data)
+        write_asset(dist_dir, names[source], data)
+
+    html = read_bytes("index.html").decode("utf-8")
+    for source in ("script.js", "style.css"):
+        html = html.replace(f'"{source}"', f'"{names[source]}"')
+    write_asset(dist_dir, "index.html", html.encode("utf-8"))
+
+    print(f"📦 Built {len(names) + 1} assets into {dist_dir}/"
+          f" ({'gzip + brotli' if brotli is not None else 'gzip only; pip install brotli for .br'})")
+    return names
+
+
+# -----------------------------------------------------------
+# SERVER
+# -----------------------------------------------------------
+
+class Asset:
+    """
+    One servable entity: its identity bytes on disk plus precompressed variants.
+    """
+
+    def __init__(self, path, content_type, immutable, data=None):
+        self.path = path
+        self.content_type = content_type
+        self.cache_control = IMMUTABLE_CACHE if immutable else REVALIDATE_CACHE
+        self.data = data  # in-memory body for generated responses
+        self.mtime = os.path.getmtime(path)
+        body = data if data is not None else read_bytes(path)
+        self.size = len(body)
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        self.etag = f'"{digest}"'
+        self.variants = {}  # encoding -> (path or bytes, size, etag)
+        for encoding, suffix in ENCODINGS:
+            if data is not None:
+                if encoding == "gzip" and self.size >= MIN_COMPRESS_BYTES:
+                    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+                    self.variants[encoding] = (compressed, len(compressed), f'"{digest}-{encoding}"')
+            elif os.path.exists(path + suffix):
+                self.variants[encoding] = (path + suffix, os.path.getsize(path + suffix), f'"{digest}-{encoding}"')
+
+
+def load_assets(dist_dir=DIST_DIR):
+    assets = {}
+    for root, _, files in os.walk(dist_dir):
+        for file_name in files:
+            if file_name.endswith((".gz", ".br")):
+                continue
+            path = os.path.join(root, file_name)
+            url = "/" + os.path.relpath(path, dist_dir).replace(os.sep, "/")
+            content_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+            if content_type.startswith("text/") or content_type == "application/json":
+                content_type += "; charset=utf-8"
+            assets[url] = Asset(path, content_type, immutable=bool(HASHED_NAME.search(file_name)))
+    assets["/"] = assets.get("/index.html")
+    return assets
+
+
+def load_crafts(path=CRAFTS_PATH):
+    with open(path, encoding="utf-8") as f:
+        crafts = json.load(f)
+    data = json.dumps(crafts, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return Asset(path, "application/json; charset=utf-8", immutable=False, data=data)
+
+
+def parse_range(header, size):
+    """
+    Returns (start, end) for a single "bytes=" range, None to serve the whole
+    body, or "unsatisfiable".
+    """
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None  # multiple or malformed ranges: ignore and send everything
+    first, last = match.groups()
+    if first == "":
+        length = int(last)
+        if length == 0:
+            return "unsatisfiable"
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return "unsatisfiable"
+    return start, end
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        if name and not re.search(r"q=0(\.0*)?\s*$", params):
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class FrontendHandler(BaseHTTPRequestHandler):
+    server_version = "ArtisanMap/1.0"
+    protocol_version = "HTTP/1.1"
+    assets = {}
+    crafts = None
+
+    def do_HEAD(self):
+        self.send_asset(head=True)
+
+    def do_GET(self):
+        self.send_asset(head=False)
+
+    def resolve(self):
+        path = self.path.split("?", 1)[0].split("#", 1)[0]
+        if path == "/api/crafts":
+            # Pick up edits to crafts.json without restarting the server
+            if os.path.getmtime(self.crafts.path) != self.crafts.mtime:
+                FrontendHandler.crafts = load_crafts(self.crafts.path)
+            return FrontendHandler.crafts
+        return self.assets.get(path)
+
+    def send_asset(self, head):
+        asset = self.resolve()
+        if asset is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        range_header = self.headers.get("Range")
+        encoding = None
+        if not range_header:
+            accepted = accepted_encodings(self.headers.get("Accept-Encoding", ""))
+            encoding = next((name for name, _ in ENCODINGS if name in accepted and name in asset.variants), None)
+        source, size, etag = asset.variants[encoding] if encoding else (asset.data or asset.path, asset.size, asset.etag)
+
+        # Only the variant being sent counts: a cached gzip copy does not validate a br response
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match and (if_none_match.strip() == "*" or
+                              etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_common_headers(asset, etag)
+            self.end_headers()
+            return
+
+        start, end, status = 0, size - 1, HTTPStatus.OK
+        if_range = self.headers.get("If-Range")
+        if range_header and (not if_range or if_range.strip() == etag):
+            byte_range = parse_range(range_header, size)
+            if byte_range == "unsatisfiable":
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if byte_range:
+                start, end = byte_range
+                status = HTTPStatus.PARTIAL_CONTENT
+
+        self.send_response(status)
+        self.send_common_headers(asset, etag)
+        self.send_header("Content-Type", asset.content_type)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if head:
+            return
+
+        if isinstance(source, bytes):
+            self.wfile.write(source[start:end + 1])
+            return
+        with open(source, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(64 * 1024, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+    def send_common_headers(self, asset, etag):
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", asset.cache_control)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Accept-Ranges", "bytes")
+
+
+def serve(host="127.0.0.1", port=8000, dist_dir=DIST_DIR):
+    FrontendHandler.assets = load_assets(dist_dir)
+    FrontendHandler.crafts = load_crafts()
+    server = ThreadingHTTPServer((host, port), FrontendHandler)
+    print(f"🌐 Serving {dist_dir}/ and /api/crafts on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and serve the artisan map frontend.")
+    parser.add_argument("--dist", default=DIST_DIR, help="build output directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("build", help="write hashed, precompressed assets")
+    serve_cmd = commands.add_parser("serve", help="build, then serve the frontend")
+    serve_cmd.add_argument("--host", default="127.0.0.1")
+    serve_cmd.add_argument("--port", type=int, default=8000)
+    serve_cmd.add_argument("--no-build", action="store_true", help="serve the existing build as is")
+    args = parser.parse_args()
+
+    if args.command == "build" or not args.no_build:
+        build(args.dist)
+    if args.command == "serve":
+        serve(args.host, args.port, args.dist)
@@ -1,13 +1,29 @@
-import speech_recognition as sr
-from googletrans import Translator
-import pyttsx3
-from nltk.tokenize import sent_tokenize
-import nltk
-nltk.download('punkt')
+import os
+import json
+import queue
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from translation import get_translator, split_sentences
+
+# speech_recognition, pyttsx3 and nltk are imported inside the functions that
+# use them, and punkt is looked up locally once instead of downloaded on every
+# start, so importing this module is cheap (see import_budget.py).
+
+# Streaming capture settings
+CALIBRATION_FILE = "mic_calibration.json"
+CALIBRATION_SECONDS = 1.5
+PAUSE_THRESHOLD = 0.8          # seconds of silence that end an utterance
+MAX_UTTERANCE_SECONDS = 15
+LISTEN_TIMEOUT = 10            # stop after this long without any speech
+RECOGNITION_WORKERS = 4
+TRANSLATION_BATCH = 8          # queued sentences sent to the translator together
 
 
 # Function to get speech input in Hindi
 def get_speech_input():
+    import speech_recognition as sr
     recognizer = sr.Recognizer()
 
     # List available microphones
@@ -40,15 +56,140 @@ def get_speech_input():
     return None
 
 
-# Function to translate Hindi → English
+# Function to calibrate the noise level once per microphone and reuse it
+def calibrate_microphone(recognizer, source, device_key, recalibrate=False):
+    calibration = {}
+    if os.path.exists(CALIBRATION_FILE):
+        with open(CALIBRATION_FILE, encoding="utf-8") as f:
+            calibration = json.load(f)
+
+    if device_key in calibration and not recalibrate:
+        recognizer.energy_threshold = calibration[device_key]
+        return
+
+    print(f"🔇 Calibrating for background noise ({CALIBRATION_SECONDS}s), please stay quiet...")
+    recognizer.adjust_for_ambient_noise(source, duration=CALIBRATION_SECONDS)
+    calibration[device_key] = recognizer.energy_threshold
+    with open(CALIBRATION_FILE, "w", encoding="utf-8") as f:
+        json.dump(calibration, f, indent=2)
+
+
+# Function to split incoming audio into utterances
+def capture_utterances(recognizer, source, timeout=None):
+    """
+    Yields one AudioData per utterance. The recognizer's energy-based voice
+    activity detection starts an utterance when speech is heard and ends it
+    after PAUSE_THRESHOLD seconds of silence.
+    """
+    import speech_recognition as sr
+    while True:
+        try:
+            audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=MAX_UTTERANCE_SECONDS)
+        except sr.WaitTimeoutError:
+            return
+        if not audio.frame_data:  # end of a WAV file
+            return
+        yield audio
+
+
+# Function to recognize a single utterance
+def recognize_chunk(recognizer, audio, language="hi-IN"):
+    import speech_recognition as sr
+    try:
+        return recognizer.recognize_google(audio, language=language)
+    except sr.UnknownValueError:
+        return None  # silence or unclear speech in this chunk
+    except sr.RequestError:
+        print("⚠️ Could not connect to Google Speech Recognition service.")
+        return None
+
+
+# Function to stream speech input utterance by utterance
+def stream_speech_input(wav_path=None, mic_index=0, language="hi-IN", recalibrate=False):
+    """
+    Yields recognized text for each utterance, in order, as soon as it is ready.
+    Capture runs on its own thread and hands each utterance to a recognition
+    thread pool, so a result is yielded as soon as its recognition finishes
+    rather than when the next utterance has been captured. Pass wav_path to
+    read from a WAV file instead of the microphone.
+    """
+    import speech_recognition as sr
+    recognizer = sr.Recognizer()
+    recognizer.pause_threshold = PAUSE_THRESHOLD
+    recognizer.dynamic_energy_threshold = False
+
+    if wav_path:
+        source = sr.AudioFile(wav_path)
+        timeout = None
+    else:
+        mic_names = sr.Microphone.list_microphone_names()
+        device_key = f"{mic_index}:{mic_names[mic_index] if mic_index < len(mic_names) else 'default'}"
+        source = sr.Microphone(device_index=mic_index)
+        timeout = LISTEN_TIMEOUT
+
+    with source, ThreadPoolExecutor(max_workers=RECOGNITION_WORKERS) as pool:
+        if not wav_path:
+            calibrate_microphone(recognizer, source, device_key, recalibrate=recalibrate)
+            print("\n🎤 Please speak your product story in Hindi (pause to finish a sentence)...")
+
+        pending = queue.Queue()  # recognition futures in capture order
+        stop = threading.Event()
+        done = object()
+        errors = []
+
+        def capture_worker():
+            try:
+                for audio in capture_utterances(recognizer, source, timeout=timeout):
+                    if stop.is_set():
+                        break
+                    pending.put(pool.submit(recognize_chunk, recognizer, audio, language))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                pending.put(done)
+
+        capture = threading.Thread(target=capture_worker, name="capture", daemon=True)
+        capture.start()
+        try:
+            while (future := pending.get()) is not done:
+                text = future.result()
+                if text:
+                    yield text
+        finally:
+            # Also reached when the caller stops iterating early
+            stop.set()
+            capture.join()
+        if errors:
+            raise errors[0]
+
+
+# Function to get the whole story through streaming capture
+def get_speech_input_streaming(wav_path=None, mic_index=0):
+    parts = []
+    for text in stream_speech_input(wav_path=wav_path, mic_index=mic_index):
+        print(f"🎤 Heard: {text}")
+        parts.append(text)
+    if not parts:
+        print("⏳ No speech detected. Try again.")
+        return None
+    text = " ".join(parts)
+    print(f"🎤 Your product story (Hindi): {text}")
+    return text
+
+
+# Function to translate Hindi → English (sentence by sentence, through the shared cache)
 def translate_text_to_english(text):
-    translator = Translator()
-    translation = translator.translate(text, src='hi', dest='en')
-    return translation.text
+    return get_translator().translate(text, src='hi', dest='en')
 
 
-# Function to narrate the translated story in English
-def narrate_story(text):
+# Function to set up the English narration voice
+def create_narrator():
+    """
+    Returns a new pyttsx3 engine with the English narration voice. pyttsx3
+    engines must be driven from the thread that created them, so callers
+    create one in the thread that narrates, for each run.
+    """
+    import pyttsx3
     engine = pyttsx3.init()
     engine.setProperty('rate', 150)
     engine.setProperty('volume', 1)
@@ -58,20 +199,134 @@ def narrate_story(text):
         if "English" in voice.name:
             engine.setProperty('voice', voice.id)
             break
+    return engine
+
 
+# Function to narrate the translated story in English
+def narrate_story(text):
+    engine = create_narrator()
     engine.say(text)
     engine.runAndWait()
 
 
+# Function to pick the English sentence splitter once per process
+_sentence_splitter = None
+
+
+def get_sentence_splitter():
+    """
+    Returns nltk's sent_tokenize when the punkt model is installed locally
+    (downloading it at most once, on first use), else the regex splitter.
+    Set NLTK_OFFLINE=1 to never reach the network.
+    """
+    global _sentence_splitter
+    if _sentence_splitter is None:
+        _sentence_splitter = split_sentences
+        try:
+            import nltk
+            from nltk.tokenize import sent_tokenize
+            try:
+                nltk.data.find('tokenizers/punkt')
+            except LookupError:
+                if os.getenv("NLTK_OFFLINE", "").lower() in ("1", "true", "yes"):
+                    raise
+                nltk.download('punkt', quiet=True)
+            sent_tokenize("Ready.")  # newer NLTK releases also need punkt_tab
+            _sentence_splitter = sent_tokenize
+        except (ImportError, LookupError, OSError) as e:
+            print(f"⚠️ NLTK punkt unavailable ({e.__class__.__name__}), splitting subtitles on punctuation.")
+    return _sentence_splitter
+
+
 # Function to generate subtitles
 def generate_subtitles(text):
-    for sentence in sent_tokenize(text):
+    for sentence in get_sentence_splitter()(text):
         print(f"📺 Subtitle: {sentence}")
 
 
+# Function to split Hindi text into sentences
+def split_hindi_sentences(text):
+    return split_sentences(text)
+
+
+# Pipelined chatbot: recognize → translate → narrate, one sentence at a time
+def chatbot_pipelined(wav_path=None, mic_index=0):
+    """
+    Runs recognition, translation and narration as separate workers joined by
+    queues, so the first English sentence is narrated and subtitled while later
+    sentences are still being recognized and translated.
+    """
+    to_translate = queue.Queue()
+    to_narrate = queue.Queue()
+    done = object()
+    story_in_english = []
+
+    def recognize_worker():
+        try:
+            for text in stream_speech_input(wav_path=wav_path, mic_index=mic_index):
+                print(f"🎤 Heard (Hindi): {text}")
+                for sentence in split_hindi_sentences(text):
+                    to_translate.put(sentence)
+        finally:
+            to_translate.put(done)
+
+    def translate_worker():
+        translator = get_translator()
+        finished = False
+        try:
+            while not finished:
+                # Block for one sentence, then batch whatever else is already queued
+                batch = [to_translate.get()]
+                while len(batch) < TRANSLATION_BATCH and not to_translate.empty():
+                    batch.append(to_translate.get())
+                if done in batch:
+                    finished = True
+                    batch = batch[:batch.index(done)]
+                if not batch:
+                    continue
+                try:
+                    for sentence in translator.translate_sentences(batch, src='hi', dest='en'):
+                        to_narrate.put(sentence)
+                except Exception as e:
+                    print(f"⚠️ Could not translate {len(batch)} sentence(s): {e}")
+        finally:
+            to_narrate.put(done)
+
+    def narrate_worker():
+        # pyttsx3 engines must be driven from the thread that created them,
+        # so every run creates its own inside this thread
+        engine = create_narrator()
+        while (sentence := to_narrate.get()) is not done:
+            story_in_english.append(sentence)
+            print(f"📺 Subtitle: {sentence}")
+            engine.say(sentence)
+            engine.runAndWait()
+
+    workers = [
+        threading.Thread(target=recognize_worker, name="recognize"),
+        threading.Thread(target=translate_worker, name="translate"),
+        threading.Thread(target=narrate_worker, name="narrate"),
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    if story_in_english:
+        print(f"✅ Translated story (English): {' '.join(story_in_english)}")
+    else:
+        print("⏳ No speech detected. Try again.")
+
+
 # Main chatbot function
-def chatbot():
-    story_in_hindi = get_speech_input()
+def chatbot(streaming=False, wav_path=None, pipelined=False):
+    if pipelined:
+        chatbot_pipelined(wav_path=wav_path)
+        return
+    if streaming or wav_path:
+        story_in_hindi = get_speech_input_streaming(wav_path=wav_path)
+    else:
+        story_in_hindi = get_speech_input()
     if story_in_hindi:
         story_in_english = translate_text_to_english(story_in_hindi)
         print(f"✅ Translated story (English): {story_in_english}")
@@ -80,7 +335,13 @@ def chatbot():
 
 
 if __name__ == "__main__":
-    chatbot()
+    parser = argparse.ArgumentParser(description="Hindi product story → English narration.")
+    parser.add_argument("--stream", action="store_true", help="capture and recognize utterance by utterance")
+    parser.add_argument("--wav", help="read the story from a WAV file instead of the microphone")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="narrate each sentence while later ones are still being recognized and translated")
+    args = parser.parse_args()
+    chatbot(streaming=args.stream, wav_path=args.wav, pipelined=args.pipeline)
 
 
 
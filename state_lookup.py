@@ -0,0 +1,271 @@
+# state_lookup.py
+"""
+Point -> Indian state lookup over the map's boundary data.
+
+The boundaries are loaded once (the same source and names as build_geodata.py)
+and indexed with an STR-packed R-tree over the bounding boxes of every polygon
+part. Points that fall in a part's box are then tested with an even-odd
+point-in-polygon check. To keep that test cheap, each part's edges are bucketed
+into horizontal bands, so a point only meets the few edges of its band. Both
+steps are vectorized over NumPy arrays:
+
+    from state_lookup import get_state_lookup
+    states = get_state_lookup()
+    states.lookup(26.91, 75.79)                        # 'Rajasthan'
+    states.lookup(lat_array, lon_array)                # array of names (None outside India)
+
+    python state_lookup.py 22.57 88.36
+    python state_lookup.py --benchmark 1000000
+"""
+import time
+import argparse
+
+import numpy as np
+
+from build_geodata import SOURCE_PATH, load_source, state_name, feature_polygons
+
+RTREE_NODE_SIZE = 4
+EDGES_PER_BAND = 8       # target edges per y-band bucket of a polygon part
+LOOKUP_CHUNK = 200_000   # points traversed together
+EDGE_TEST_CHUNK = 8_000_000  # (point, edge) pairs evaluated together
+
+
+def _str_order(boxes, node_size):
+    """
+    Sort-Tile-Recursive order: consecutive runs of node_size boxes are spatially compact.
+    """
+    count = len(boxes)
+    centers_x = (boxes[:, 0] + boxes[:, 2]) / 2
+    centers_y = (boxes[:, 1] + boxes[:, 3]) / 2
+    slice_count = int(np.ceil(np.sqrt(np.ceil(count / node_size))))
+    slice_size = slice_count * node_size
+    by_x = np.argsort(centers_x, kind="stable")
+    return np.concatenate([
+        chunk[np.argsort(centers_y[chunk], kind="stable")]
+        for chunk in (by_x[i:i + slice_size] for i in range(0, count, slice_size))
+    ])
+
+
+class StateLookup:
+    """
+    Spatial index over state polygons.
+    """
+
+    def __init__(self, features, node_size=RTREE_NODE_SIZE, edges_per_band=EDGES_PER_BAND):
+        self.names = np.array([state_name(feature.get("properties") or {}) for feature in features], dtype=object)
+
+        part_state, part_boxes, part_edges = [], [], []
+        for state, feature in enumerate(features):
+            for polygon in feature_polygons(feature.get("geometry") or {"type": None}):
+                rings = [np.asarray(ring, dtype=np.float64)[:, :2] for ring in polygon if len(ring) >= 3]
+                if not rings:
+                    continue
+                # Exterior and holes together: the even-odd rule handles the holes
+                edges = np.vstack([np.hstack([ring[:-1], ring[1:]]) for ring in rings])
+                part_state.append(state)
+                part_boxes.append([rings[0][:, 0].min(), rings[0][:, 1].min(),
+                                   rings[0][:, 0].max(), rings[0][:, 1].max()])
+                part_edges.append(edges)
+
+        order = _str_order(np.array(part_boxes), node_size)
+        self.part_state = np.array(part_state)[order]
+        self.part_boxes = np.array(part_boxes)[order]
+        self._build_bands([part_edges[i] for i in order], edges_per_band)
+        self._build_tree(node_size)
+
+    @classmethod
+    def from_source(cls, path=SOURCE_PATH):
+        collection = load_source(path)
+        return cls([feature for feature in collection["features"] if feature.get("geometry")])
+
+    def _build_bands(self, part_edges, edges_per_band):
+        """
+        Buckets each part's edges by y-band into one CSR layout shared by all parts.
+        """
+        band_offset, band_y0, band_height, band_count = [], [], [], []
+        bucket_edges, bucket_ids = [], []
+        total_bands = 0
+        for part, edges in enumerate(part_edges):
+            y0, y1 = self.part_boxes[part, 1], self.part_boxes[part, 3]
+            bands = max(1, len(edges) // edges_per_band)
+            height = (y1 - y0) / bands or 1.0
+            low = np.clip(((np.minimum(edges[:, 1], edges[:, 3]) - y0) / height).astype(np.int64), 0, bands - 1)
+            high = np.clip(((np.maximum(edges[:, 1], edges[:, 3]) - y0) / height).astype(np.int64), 0, bands - 1)
+            spans = high - low + 1
+            edge_index = np.repeat(np.arange(len(edges)), spans)
+            band = np.repeat(low, spans) + (np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans))
+            bucket_edges.append(edges[edge_index])
+            bucket_ids.append(band + total_bands)
+            band_offset.append(total_bands)
+            band_y0.append(y0)
+            band_height.append(height)
+            band_count.append(bands)
+            total_bands += bands
+
+        ids = np.concatenate(bucket_ids)
+        order = np.argsort(ids, kind="stable")
+        self.edges = np.concatenate(bucket_edges)[order]
+        self.band_start = np.searchsorted(ids[order], np.arange(total_bands))
+        self.band_size = np.diff(np.append(self.band_start, len(ids)))
+        self.part_band_offset = np.array(band_offset)
+        self.part_band_y0 = np.array(band_y0)
+        self.part_band_height = np.array(band_height)
+        self.part_band_count = np.array(band_count)
+
+    def _build_tree(self, node_size):
+        """
+        Packs the parts into R-tree levels, leaves first. levels[i] is
+        (boxes, child_start, child_count) with children in the level below
+        (or in the part arrays for the leaf level).
+        """
+        self.levels = []
+        boxes = self.part_boxes
+        while True:
+            count = len(boxes)
+            starts = np.arange(0, count, node_size)
+            counts = np.minimum(node_size, count - starts)
+            node_boxes = np.column_stack([
+                np.minimum.reduceat(boxes[:, 0], starts), np.minimum.reduceat(boxes[:, 1], starts),
+                np.maximum.reduceat(boxes[:, 2], starts), np.maximum.reduceat(boxes[:, 3], starts),
+            ])
+            if len(node_boxes) > 1:
+                order = _str_order(node_boxes, node_size)
+                node_boxes, starts, counts = node_boxes[order], starts[order], counts[order]
+            self.levels.append((node_boxes, starts, counts))
+            if len(node_boxes) == 1:
+                break
+            boxes = node_boxes
+        self.levels.reverse()  # root first
+        # Box columns of each level's children, contiguous for fast gathers
+        self._child_columns = [
+            tuple(np.ascontiguousarray(column) for column in boxes.T)
+            for boxes in [level[0] for level in self.levels[1:]] + [self.part_boxes]
+        ]
+
+    @staticmethod
+    def _expand(pair_point, pair_node, starts, counts):
+        sizes = counts[pair_node]
+        repeated = np.repeat(np.arange(len(pair_point)), sizes)
+        offsets = np.arange(len(repeated)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        return pair_point[repeated], starts[pair_node][repeated] + offsets
+
+    def _candidates(self, x, y):
+        """
+        Walks the R-tree for all points at once; returns (point, part) pairs
+        whose part bounding box contains the point.
+        """
+        root_boxes = self.levels[0][0]
+        inside = ((x >= root_boxes[0, 0]) & (x <= root_boxes[0, 2])
+                  & (y >= root_boxes[0, 1]) & (y <= root_boxes[0, 3]))
+        pair_point = np.nonzero(inside)[0]
+        pair_node = np.zeros(len(pair_point), dtype=np.int64)
+        for (_, starts, counts), (min_x, min_y, max_x, max_y) in zip(self.levels, self._child_columns):
+            pair_point, pair_node = self._expand(pair_point, pair_node, starts, counts)
+            px, py = x[pair_point], y[pair_point]
+            keep = (px >= min_x[pair_node]) & (px <= max_x[pair_node])
+            keep &= (py >= min_y[pair_node]) & (py <= max_y[pair_node])
+            pair_point, pair_node = pair_point[keep], pair_node[keep]
+        return pair_point, pair_node
+
+    def _contains(self, x, y, pair_point, pair_part):
+        """
+        Even-odd test of each (point, part) pair against the edges in the point's y-band.
+        """
+        px, py = x[pair_point], y[pair_point]
+        band = np.clip(((py - self.part_band_y0[pair_part]) / self.part_band_height[pair_part]).astype(np.int64),
+                       0, self.part_band_count[pair_part] - 1)
+        band += self.part_band_offset[pair_part]
+        sizes = self.band_size[band]
+
+        inside = np.zeros(len(pair_point), dtype=bool)
+        ends = np.cumsum(sizes)
+        start = 0
+        while start < len(pair_point):
+            stop = max(start + 1, int(np.searchsorted(ends, ends[start] - sizes[start] + EDGE_TEST_CHUNK)))
+            chunk_sizes = sizes[start:stop]
+            pair = np.repeat(np.arange(start, stop), chunk_sizes)
+            offsets = np.arange(len(pair)) - np.repeat(np.cumsum(chunk_sizes) - chunk_sizes, chunk_sizes)
+            edge = self.edges[self.band_start[band[pair]] + offsets]
+            ex, ey = px[pair], py[pair]
+            x1, y1, x2, y2 = edge[:, 0], edge[:, 1], edge[:, 2], edge[:, 3]
+            straddles = (y1 > ey) != (y2 > ey)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                crossing_x = x1 + (ey - y1) * (x2 - x1) / (y2 - y1)
+            crossings = np.bincount(pair - start, weights=straddles & (ex < crossing_x), minlength=stop - start)
+            inside[start:stop] = crossings.astype(np.int64) % 2 == 1
+            start = stop
+        return inside
+
+    def lookup_index(self, lat, lon):
+        """
+        Returns the index into self.names of the state containing each point, or -1.
+        """
+        lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        lon = np.atleast_1d(np.asarray(lon, dtype=np.float64))
+        result = np.full(lat.shape, -1, dtype=np.int64)
+        for start in range(0, len(lat), LOOKUP_CHUNK):
+            x, y = lon[start:start + LOOKUP_CHUNK], lat[start:start + LOOKUP_CHUNK]
+            pair_point, pair_part = self._candidates(x, y)
+            inside = self._contains(x, y, pair_point, pair_part)
+            # Where parts overlap, the first state in the source wins
+            hits = np.full(len(x), len(self.names), dtype=np.int64)
+            np.minimum.at(hits, pair_point[inside], self.part_state[pair_part[inside]])
+            result[start:start + LOOKUP_CHUNK] = np.where(hits < len(self.names), hits, -1)
+        return result
+
+    def lookup(self, lat, lon):
+        """
+        Returns the state name for a point, or an array of names (None outside
+        every state) when lat and lon are arrays.
+        """
+        index = self.lookup_index(lat, lon)
+        names = np.where(index >= 0, self.names[np.maximum(index, 0)], None)
+        return names[0] if np.ndim(lat) == 0 else names
+
+
+_lookup = None
+
+
+def get_state_lookup():
+    """
+    Returns the process-wide StateLookup, loading the boundaries on first use.
+    """
+    global _lookup
+    if _lookup is None:
+        _lookup = StateLookup.from_source()
+    return _lookup
+
+
+def benchmark(points, seed=0):
+    started = time.perf_counter()
+    states = StateLookup.from_source()
+    build_seconds = time.perf_counter() - started
+
+    rng = np.random.default_rng(seed)
+    min_lon, min_lat, max_lon, max_lat = states.levels[0][0][0]
+    lat = rng.uniform(min_lat, max_lat, points)
+    lon = rng.uniform(min_lon, max_lon, points)
+
+    started = time.perf_counter()
+    index = states.lookup_index(lat, lon)
+    lookup_seconds = time.perf_counter() - started
+
+    print(f"🗺️ Index built in {build_seconds:.2f}s: {len(states.part_state)} polygon parts, "
+          f"{len(states.edges)} bucketed edges, {len(states.levels)} R-tree levels")
+    print(f"📍 {points} points in {lookup_seconds:.2f}s: {points / lookup_seconds:,.0f} points/sec, "
+          f"{np.mean(index >= 0):.1%} inside a state")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the Indian state containing a point.")
+    parser.add_argument("lat", nargs="?", type=float)
+    parser.add_argument("lon", nargs="?", type=float)
+    parser.add_argument("--benchmark", type=int, metavar="POINTS", help="time a batch of random points")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+    elif args.lat is not None and args.lon is not None:
+        print(get_state_lookup().lookup(args.lat, args.lon) or "Outside India")
+    else:
+        parser.error("give LAT LON or --benchmark POINTS")
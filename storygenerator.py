@@ -2,17 +2,181 @@
 import os
 import json
 import re
+import time
+import random
+import asyncio
+import hashlib
+import threading
 from dotenv import load_dotenv
-import google.generativeai as genai
 from json import JSONDecodeError
 
-# --- Load API key safely ---
+from instrumentation import span, count
+
+# --- Load API key safely (checked when the Gemini client is first needed) ---
 load_dotenv()
 API_KEY = os.getenv("GOOGLE_API_KEY")
-if not API_KEY:
-    raise EnvironmentError("❌ GOOGLE_API_KEY not found. Please set it in your .env file.")
 
-genai.configure(api_key=API_KEY)
+MODEL_NAME = "gemini-1.5-flash"
+
+# --- Script cache settings ---
+SCRIPT_CACHE_DIR = "script_cache"
+SCRIPT_CACHE_TTL = 7 * 24 * 60 * 60  # seconds
+SCRIPT_CACHE_MAX_ENTRIES = 1000
+SCRIPT_CACHE_SWEEP_EVERY = 100  # puts between full directory sweeps for expired entries
+SCRIPT_CACHE_LOW_WATER = 0.9  # an over-full cache is trimmed to this share of max_entries
+# Set SCRIPT_CACHE_DISABLED=1 to always call Gemini
+SCRIPT_CACHE_ENABLED = os.getenv("SCRIPT_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+
+
+class ScriptCache:
+    """
+    Persistent on-disk cache of parsed reel scripts.
+
+    Entries are keyed by a hash of the model name and the full prompt, so any
+    change to the artisan details or the prompt template is a new entry.
+    Entries expire `ttl` seconds after they were generated (the creation time
+    is stored in the entry), however often they are read. A file's mtime only
+    records its last use, and the least recently used files are dropped once
+    there are more than `max_entries` (down to SCRIPT_CACHE_LOW_WATER of it).
+    The directory is only scanned when the running entry count crosses
+    `max_entries` or every `sweep_every` puts, not on every put.
+    """
+
+    def __init__(self, cache_dir=SCRIPT_CACHE_DIR, ttl=SCRIPT_CACHE_TTL, max_entries=SCRIPT_CACHE_MAX_ENTRIES,
+                 sweep_every=SCRIPT_CACHE_SWEEP_EVERY):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.sweep_every = sweep_every
+        self.hits = 0
+        self.misses = 0
+        self._entries = None  # running count, refreshed by every sweep
+        self._puts_since_sweep = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(prompt, model_name=MODEL_NAME):
+        return hashlib.sha256(f"{model_name}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """
+        Returns the cached scenes for `key`, or None on a miss or expired entry.
+        """
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            if time.time() - entry["created"] > self.ttl:
+                os.remove(path)
+                raise FileNotFoundError(path)
+            scenes = entry["scenes"]
+            os.utime(path)  # mark as recently used for LRU eviction
+        except (OSError, JSONDecodeError, KeyError, TypeError):
+            with self._lock:
+                self.misses += 1
+            count("script_cache_miss")
+            return None
+
+        with self._lock:
+            self.hits += 1
+        count("script_cache_hit")
+        return scenes
+
+    def put(self, key, scenes):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"created": time.time(), "scenes": scenes}, f, ensure_ascii=False)
+        is_new = not os.path.exists(path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._puts_since_sweep += 1
+            if self._entries is not None and is_new:
+                self._entries += 1
+            sweep = (self._entries is None or self._entries > self.max_entries
+                     or self._puts_since_sweep >= self.sweep_every)
+            if sweep:
+                self._puts_since_sweep = 0
+        if sweep:
+            remaining = self._evict()
+            with self._lock:
+                self._entries = remaining
+
+    def _evict(self):
+        """
+        Drops expired and least recently used entries. Returns how many are left.
+        """
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            # Unused for longer than the TTL means created before it, too
+            if now - mtime > self.ttl:
+                _silent_remove(path)
+            else:
+                entries.append((mtime, path))
+
+        if len(entries) <= self.max_entries:
+            return len(entries)
+        # Trim below the limit so the next few puts don't each trigger a sweep
+        keep = int(self.max_entries * SCRIPT_CACHE_LOW_WATER)
+        for _, path in sorted(entries)[:len(entries) - keep]:
+            _silent_remove(path)
+        return keep
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+def _silent_remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+script_cache = ScriptCache()
+
+# --- Batch request settings ---
+MAX_CONCURRENT_REQUESTS = 8
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0  # seconds, doubled on every retry
+BACKOFF_MAX = 30.0
+RETRYABLE_STATUS_CODES = (429, 500, 503)
+
+_model = None
+
+
+def get_model():
+    """
+    Returns the shared Gemini client, creating it on first use.
+    google.generativeai is imported and configured here rather than at module
+    load, so importing this module (and spawning workers) stays cheap.
+    """
+    global _model
+    if _model is None:
+        if not API_KEY:
+            raise EnvironmentError("❌ GOOGLE_API_KEY not found. Please set it in your .env file.")
+        import google.generativeai as genai
+        genai.configure(api_key=API_KEY)
+        _model = genai.GenerativeModel(MODEL_NAME)
+    return _model
 
 
 def build_prompt(artisan_name, product, material, inspiration, target_audience):
@@ -63,21 +227,11 @@ Example JSON format:
 """
 
 
-def generate_script(artisan_name, product, material, inspiration, target_audience):
+def parse_script(raw_text):
     """
-    Uses Gemini to create a marketing reel script.
-    Returns a list of dictionaries with scene, voiceover, and text.
+    Extracts the scene list from a Gemini response.
+    Returns a list of dictionaries with scene, voiceover, and text, or None.
     """
-    model = genai.GenerativeModel("gemini-1.5-flash")
-    prompt = build_prompt(artisan_name, product, material, inspiration, target_audience)
-
-    try:
-        response = model.generate_content(prompt)
-        raw_text = response.text.strip()
-    except Exception as e:
-        print(f"❌ Error during Gemini API call: {e}")
-        return None  # Correctly indented
-
     json_match = re.search(r"```json\n(.*)\n```", raw_text, re.DOTALL)
     if json_match:
         text_to_parse = json_match.group(1).strip()
@@ -104,6 +258,179 @@ def generate_script(artisan_name, product, material, inspiration, target_audienc
         return None  # Correctly indented
 
 
+def _cached_script(prompt, use_cache):
+    """
+    Returns (cache_key, cached scenes or None) for a prompt.
+    """
+    cache_key = ScriptCache.make_key(prompt, MODEL_NAME)
+    return cache_key, script_cache.get(cache_key) if use_cache else None
+
+
+def _store_script(cache_key, raw_text, use_cache):
+    """
+    Parses a Gemini response and caches the scenes when they are valid.
+    """
+    scenes = parse_script(raw_text)
+    if scenes and use_cache:
+        script_cache.put(cache_key, scenes)
+    return scenes
+
+
+def generate_script(artisan_name, product, material, inspiration, target_audience, use_cache=SCRIPT_CACHE_ENABLED):
+    """
+    Uses Gemini to create a marketing reel script.
+    Returns a list of dictionaries with scene, voiceover, and text.
+    Identical requests are served from the script cache unless use_cache is False.
+    """
+    prompt = build_prompt(artisan_name, product, material, inspiration, target_audience)
+
+    cache_key, cached = _cached_script(prompt, use_cache)
+    if cached is not None:
+        return cached
+
+    model = get_model()
+    try:
+        with span("llm", model=MODEL_NAME):
+            response = model.generate_content(prompt)
+        raw_text = response.text.strip()
+    except Exception as e:
+        print(f"❌ Error during Gemini API call: {e}")
+        return None  # Correctly indented
+
+    return _store_script(cache_key, raw_text, use_cache)
+
+
+# -----------------------------------------------------------
+# ASYNC BATCH GENERATION
+# -----------------------------------------------------------
+
+def _is_retryable(error):
+    """
+    True for rate limits (HTTP 429) and transient server errors.
+    """
+    code = getattr(error, "code", None)
+    try:
+        if int(code) in RETRYABLE_STATUS_CODES:
+            return True
+    except (TypeError, ValueError):
+        pass
+    message = str(error).lower()
+    return "429" in message or "resource has been exhausted" in message or "rate limit" in message
+
+
+def _backoff_delay(attempt):
+    """
+    Exponential backoff with full jitter, so throttled requests don't retry in lockstep.
+    """
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+async def _generate_one(model, artisan_info, semaphore, use_cache):
+    prompt = build_prompt(**artisan_info)
+    # Cache reads and writes are file I/O, so keep them off the event loop
+    cache_key, cached = await asyncio.to_thread(_cached_script, prompt, use_cache)
+    if cached is not None:
+        return cached
+
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with semaphore:
+                with span("llm", model=MODEL_NAME, attempt=attempt):
+                    response = await model.generate_content_async(prompt)
+            raw_text = response.text.strip()
+            break
+        except Exception as e:
+            if attempt < MAX_RETRIES and _is_retryable(e):
+                count("llm_retry")
+                # Sleep outside the semaphore so other requests keep flowing
+                await asyncio.sleep(_backoff_delay(attempt))
+                continue
+            print(f"❌ Error during Gemini API call for {artisan_info.get('artisan_name')}: {e}")
+            return None
+
+    return await asyncio.to_thread(_store_script, cache_key, raw_text, use_cache)
+
+
+async def generate_scripts(batch, concurrency=MAX_CONCURRENT_REQUESTS, model=None,
+                           use_cache=SCRIPT_CACHE_ENABLED, on_result=None):
+    """
+    Generates scripts for many artisans with up to `concurrency` Gemini requests in flight.
+
+    Args:
+        batch (list): Dictionaries with the build_prompt() keyword arguments.
+        concurrency (int): Maximum number of concurrent requests.
+        model: Client with an async generate_content_async(); defaults to the shared Gemini model.
+        use_cache (bool): Serve and store results through the script cache.
+        on_result (callable): Optional callback(index, scenes, seconds), called as each script finishes.
+
+    Returns:
+        list: One scene list (or None on failure) per batch entry, in input order.
+    """
+    model = model or get_model()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(index, artisan_info):
+        started = time.perf_counter()
+        scenes = await _generate_one(model, artisan_info, semaphore, use_cache)
+        if on_result:
+            on_result(index, scenes, time.perf_counter() - started)
+        return scenes
+
+    return await asyncio.gather(*(run(i, info) for i, info in enumerate(batch)))
+
+
+class FakeModel:
+    """
+    Offline stand-in for genai.GenerativeModel.
+
+    Returns a valid four-scene script after `latency` seconds and fails every
+    `rate_limit_every`-th call with a 429 error, so batching, concurrency limits
+    and backoff can be exercised without network access or quota.
+    """
+
+    class RateLimitError(Exception):
+        code = 429
+
+    class _Response:
+        def __init__(self, text):
+            self.text = text
+
+    def __init__(self, latency=0.05, rate_limit_every=0):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _respond(self, prompt):
+        self.calls += 1
+        if self.rate_limit_every and self.calls % self.rate_limit_every == 0:
+            raise self.RateLimitError("429 Resource has been exhausted (fake)")
+
+        match = re.search(r"- Artisan: (.*)", prompt)
+        artisan = match.group(1).strip() if match else "the artisan"
+        scenes = [
+            {"scene": "Hands shaping the raw material.", "voiceover": f"Meet {artisan}, keeping a tradition alive.", "text": "Made by hand."},
+            {"scene": "The artisan at work.", "voiceover": "Every piece is shaped with patience and skill.", "text": "Crafted with passion."},
+            {"scene": "The finished product at home.", "voiceover": "Bring a story into your home.", "text": "Timeless design."},
+            {"scene": "Brand logo and website.", "voiceover": "Order yours today and support local artisans.", "text": "Shop now."},
+        ]
+        return self._Response(f"```json\n{json.dumps(scenes, indent=2)}\n```")
+
+    async def generate_content_async(self, prompt):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            return self._respond(prompt)
+        finally:
+            self.in_flight -= 1
+
+    def generate_content(self, prompt):
+        time.sleep(self.latency)
+        return self._respond(prompt)
+
+
 # --- Example Usage for a Hackathon Demo ---
 if __name__ == "__main__":
     test_script = generate_script(
@@ -118,4 +445,6 @@ if __name__ == "__main__":
         print("✅ Successfully generated and parsed a valid script:")
         print(json.dumps(test_script, indent=2))
     else:
-        print("❌ Script generation and parsing failed.")
\ No newline at end of file
+        print("❌ Script generation and parsing failed.")
+
+    print(f"📦 Script cache: {script_cache.stats()}")
\ No newline at end of file
@@ -0,0 +1,198 @@
+# translation.py
+"""
+Sentence-level translation with a shared client, an in-memory LRU, an
+on-disk cache and batched requests for cache misses.
+
+Backends implement TranslationBackend.translate_batch(), so the network
+service can be swapped for DictionaryBackend (offline, or a stub in tests):
+
+    translator = CachedTranslator(DictionaryBackend({"मिट्टी": "clay"}), cache_path=None)
+    translator.translate("मिट्टी", src="hi", dest="en")
+"""
+import re
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from instrumentation import span, count
+
+TRANSLATION_CACHE_DB = "translation_cache.db"
+TRANSLATION_LRU_SIZE = 4096
+TRANSLATION_BATCH_SIZE = 50
+
+# Hindi sentences end with a danda (।); recognized speech may also use ?, ! or .
+SENTENCE_END = re.compile(r"(?<=[।?!.])\s+")
+
+
+def split_sentences(text):
+    return [sentence.strip() for sentence in SENTENCE_END.split(text) if sentence.strip()]
+
+
+class TranslationBackend:
+    """
+    Interface for translation services.
+    """
+    name = "base"
+
+    def translate_batch(self, texts, src, dest):
+        """
+        Returns one translation per input text, in order.
+        """
+        raise NotImplementedError
+
+
+class GoogleTranslateBackend(TranslationBackend):
+    """
+    googletrans with one Translator shared by every call.
+    """
+    name = "googletrans"
+
+    def __init__(self):
+        self._translator = None
+
+    def translate_batch(self, texts, src, dest):
+        if self._translator is None:
+            from googletrans import Translator
+            self._translator = Translator()
+        results = self._translator.translate(list(texts), src=src, dest=dest)
+        if not isinstance(results, list):
+            results = [results]
+        return [result.text for result in results]
+
+
+class DictionaryBackend(TranslationBackend):
+    """
+    Offline lookup table. Unknown texts are returned unchanged unless a
+    fallback backend is given.
+    """
+    name = "dictionary"
+
+    def __init__(self, entries, fallback=None):
+        self.entries = dict(entries)
+        self.fallback = fallback
+
+    @classmethod
+    def from_json(cls, path, fallback=None):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), fallback=fallback)
+
+    def translate_batch(self, texts, src, dest):
+        results = [self.entries.get(text) for text in texts]
+        unknown = [text for text, result in zip(texts, results) if result is None]
+        if unknown and self.fallback:
+            fallback_results = iter(self.fallback.translate_batch(unknown, src, dest))
+            return [result if result is not None else next(fallback_results) for result in results]
+        return [result if result is not None else text for text, result in zip(texts, results)]
+
+
+class CachedTranslator:
+    """
+    Translates text sentence by sentence through an LRU and an SQLite cache;
+    only sentences missing from both are sent to the backend, in batches.
+    """
+
+    def __init__(self, backend=None, cache_path=TRANSLATION_CACHE_DB, lru_size=TRANSLATION_LRU_SIZE,
+                 batch_size=TRANSLATION_BATCH_SIZE):
+        self.backend = backend or GoogleTranslateBackend()
+        self.lru_size = lru_size
+        self.batch_size = batch_size
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if cache_path:
+            self._db = sqlite3.connect(cache_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "backend TEXT, src TEXT, dest TEXT, text TEXT, translation TEXT, "
+                "PRIMARY KEY (backend, src, dest, text))"
+            )
+            self._db.commit()
+
+    def translate(self, text, src="hi", dest="en"):
+        return " ".join(self.translate_sentences(split_sentences(text), src, dest))
+
+    def translate_sentences(self, sentences, src="hi", dest="en"):
+        """
+        Returns one translation per sentence, in order.
+        """
+        backend = self.backend  # one backend per call, even if it is swapped meanwhile
+        results = {}
+        missing = []
+        pending = set()
+        with self._lock:
+            for sentence in sentences:
+                if sentence in results or sentence in pending:
+                    continue
+                key = (backend.name, src, dest, sentence)
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    results[sentence] = self._lru[key]
+                    self.hits += 1
+                    count("translation_cache_hit")
+                    continue
+                cached = self._disk_get(backend, src, dest, sentence)
+                if cached is not None:
+                    results[sentence] = cached
+                    self._remember(key, cached)
+                    self.disk_hits += 1
+                    count("translation_cache_disk_hit")
+                else:
+                    missing.append(sentence)
+                    pending.add(sentence)
+
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            count("translation_cache_miss", len(batch))
+            with span("translate", backend=backend.name):
+                translations = backend.translate_batch(batch, src, dest)
+            with self._lock:
+                self.misses += len(batch)
+                for sentence, translation in zip(batch, translations):
+                    results[sentence] = translation
+                    self._remember((backend.name, src, dest, sentence), translation)
+                    self._disk_put(backend, src, dest, sentence, translation)
+                if self._db:
+                    self._db.commit()
+
+        return [results[sentence] for sentence in sentences]
+
+    def _remember(self, key, translation):
+        self._lru[key] = translation
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def _disk_get(self, backend, src, dest, text):
+        if not self._db:
+            return None
+        row = self._db.execute(
+            "SELECT translation FROM translations WHERE backend = ? AND src = ? AND dest = ? AND text = ?",
+            (backend.name, src, dest, text),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _disk_put(self, backend, src, dest, text, translation):
+        if self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)",
+                (backend.name, src, dest, text, translation),
+            )
+
+    def stats(self):
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
+
+
+_translator = None
+
+
+def get_translator():
+    """
+    Returns the process-wide CachedTranslator backed by googletrans.
+    """
+    global _translator
+    if _translator is None:
+        _translator = CachedTranslator()
+    return _translator
@@ -0,0 +1,133 @@
+# voiceover_service.py
+import os
+import json
+import wave
+import hashlib
+import threading
+
+from instrumentation import span, count
+from disk_cache import evict_files, touch
+
+VOICEOVER_CACHE_DIR = os.path.join("voiceovers", "cache")
+VOICEOVER_CACHE_MAX_MB = 1024
+VOICEOVER_CACHE_TTL = 30 * 24 * 60 * 60  # seconds since a voiceover was last used
+VOICEOVER_CACHE_EVICT_EVERY = 32  # new voiceovers between eviction sweeps
+
+
+class VoiceoverService:
+    """
+    Text-to-speech with one pyttsx3 engine per process and a content-addressed cache.
+
+    Audio is stored under a hash of (text, voice, rate), so unchanged
+    voiceovers are never synthesized twice and concurrent jobs never write
+    to each other's files. The folder is bounded by age and size with
+    evict_files() every VOICEOVER_CACHE_EVICT_EVERY new voiceovers.
+    """
+
+    def __init__(self, cache_dir=VOICEOVER_CACHE_DIR, voice=None, rate=None, max_mb=VOICEOVER_CACHE_MAX_MB,
+                 ttl=VOICEOVER_CACHE_TTL):
+        """
+        Args:
+            cache_dir (str): Folder holding the synthesized audio and its metadata.
+            voice (str): pyttsx3 voice id, or None for the system default.
+            rate (int): Speaking rate in words per minute, or None for the default.
+            max_mb (float): Size the folder is trimmed to, least recently used first.
+            ttl (float): Seconds after its last use that a voiceover is deleted.
+        """
+        self.cache_dir = cache_dir
+        self.voice = voice
+        self.rate = rate
+        self.max_mb = max_mb
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._engine = None
+        self._engine_defaults = None  # (voice, rate) the engine started with
+        self._lock = threading.Lock()  # pyttsx3 engines are not thread-safe
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_engine(self):
+        if self._engine is None:
+            import pyttsx3
+            self._engine = pyttsx3.init()
+            self._engine_defaults = (self._engine.getProperty("voice"), self._engine.getProperty("rate"))
+        return self._engine
+
+    @staticmethod
+    def cache_key(text, voice=None, rate=None):
+        payload = json.dumps([text, voice or "default", rate or "default"], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def synthesize(self, text, voice=None, rate=None):
+        """
+        Returns (audio_path, duration_seconds) for `text`, synthesizing it only on a cache miss.
+        """
+        voice = voice or self.voice
+        rate = rate or self.rate
+        key = self.cache_key(text, voice, rate)
+        audio_path = os.path.join(self.cache_dir, f"{key}.wav")
+        meta_path = os.path.join(self.cache_dir, f"{key}.json")
+
+        if os.path.exists(audio_path) and os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                duration = json.load(f)["duration"]
+            self.hits += 1
+            count("voiceover_cache_hit")
+            touch(audio_path)  # mark as recently used for LRU eviction
+            return audio_path, duration
+
+        self.misses += 1
+        count("voiceover_cache_miss")
+        tmp_path = f"{audio_path}.{os.getpid()}.{threading.get_ident()}.tmp.wav"
+        with self._lock, span("tts"):
+            engine = self.get_engine()
+            # Always set both: the shared engine keeps the previous call's voice
+            # and rate, while the cache key says "default" for None
+            default_voice, default_rate = self._engine_defaults
+            engine.setProperty("voice", voice or default_voice)
+            engine.setProperty("rate", rate or default_rate)
+            engine.save_to_file(text, tmp_path)
+            engine.runAndWait()
+
+        duration = audio_duration(tmp_path)
+        os.replace(tmp_path, audio_path)
+        tmp_meta = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump({"text": text, "voice": voice, "rate": rate, "duration": duration}, f, ensure_ascii=False)
+        os.replace(tmp_meta, meta_path)
+        if (self.misses - 1) % VOICEOVER_CACHE_EVICT_EVERY == 0:
+            evict_files(self.cache_dir, self.max_mb, self.ttl, keep=[audio_path], counter="voiceover_cache_evicted")
+        return audio_path, duration
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def audio_duration(path):
+    """
+    Returns the length of an audio file in seconds.
+    """
+    try:
+        with wave.open(path, "rb") as w:
+            return w.getnframes() / float(w.getframerate())
+    except (wave.Error, EOFError):
+        # Some TTS drivers write AIFF/MP3 regardless of the extension
+        from moviepy.audio.io.AudioFileClip import AudioFileClip
+        clip = AudioFileClip(path)
+        try:
+            return clip.duration
+        finally:
+            clip.close()
+
+
+_service = None
+
+
+def get_voiceover_service():
+    """
+    Returns this process's VoiceoverService, so each worker initializes pyttsx3 only once.
+    """
+    global _service
+    if _service is None:
+        _service = VoiceoverService()
+    return _service